@@ -0,0 +1,87 @@
+import argparse
+import json
+import sys
+import tracemalloc
+from itertools import cycle, islice
+from sahandler.query import QueryHandler
+from benchmarks.fixtures import Item, get_filters, get_session
+
+
+def make_filters(count):
+    return [make_filter() for make_filter in islice(cycle(get_filters().values()), count)]
+
+
+def get_instance_size(f):
+    size = sys.getsizeof(f)
+    if hasattr(f, "__dict__"):
+        size += sys.getsizeof(f.__dict__)
+    return size
+
+
+def trace(fn, repeat):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        kept = [fn() for _ in range(repeat)]
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "bytes": sum(s.size_diff for s in stats) / repeat,
+        "blocks": sum(s.count_diff for s in stats) / repeat,
+        "peak": peak / repeat,
+    }
+
+
+def bench(db, filter_count, repeat):
+    filters = make_filters(filter_count)
+
+    def build_request():
+        handler = QueryHandler(db, Item)
+        for f in make_filters(filter_count):
+            handler.add_filter(f)
+        handler.get_count_query()
+        handler.get_query()
+        return handler
+
+    filter_memory = trace(lambda: make_filters(filter_count), repeat)
+    request_memory = trace(build_request, repeat)
+    return {
+        "filters": filter_count,
+        "instance_bytes": sum(get_instance_size(f) for f in filters) / filter_count,
+        "filter_bytes_per_request": filter_memory["bytes"],
+        "filter_blocks_per_request": filter_memory["blocks"],
+        "request_bytes": request_memory["bytes"],
+        "request_blocks": request_memory["blocks"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sahandler filter memory benchmark")
+    parser.add_argument("--filters", type=int, nargs="+", default=[20, 40])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    db = get_session(100)
+    results = {}
+    for filter_count in args.filters:
+        results[str(filter_count)] = result = bench(db, filter_count, args.repeat)
+        print("%3d filters  %6.0f B/filter  %8.0f B %6.0f blocks per filter set  %9.0f B %7.0f blocks per request" % (
+            filter_count,
+            result["instance_bytes"],
+            result["filter_bytes_per_request"],
+            result["filter_blocks_per_request"],
+            result["request_bytes"],
+            result["request_blocks"],
+        ))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"python": sys.version, "results": results}, fh, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
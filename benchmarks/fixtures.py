@@ -0,0 +1,195 @@
+import json
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from sqlalchemy import Column, Date, DateTime, DECIMAL, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base, relationship
+from sahandler.filters import (
+    DefaultFilter, OrFilter, MultiOrFilter, OneToOneJoinFilter, OneToManyJoinFilter, ManyToManyJoinFilter,
+    KeyValueJoinFactory,
+)
+
+Base = declarative_base()
+STATUSES = ["open", "closed", "pending", "archived"]
+
+
+class Owner(Base):
+    __tablename__ = "owners"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    app = Column(String(10))
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    app = Column(String(10))
+
+
+class ItemTag(Base):
+    __tablename__ = "item_tags"
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"))
+    app = Column(String(10))
+    tag = relationship(Tag)
+
+
+class Comment(Base):
+    __tablename__ = "comments"
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
+    body = Column(String(200))
+    app = Column(String(10))
+
+
+class Attribute(Base):
+    __tablename__ = "attributes"
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
+    key = Column(String(50))
+    value = Column(String(50))
+    app = Column(String(10))
+
+
+class Item(Base):
+    __tablename__ = "items"
+    DEFAULT_FIELDS = ["id"]
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    status = Column(String(10), index=True)
+    price = Column(DECIMAL(10, 2))
+    quantity = Column(Integer)
+    created_at = Column(DateTime)
+    due_on = Column(Date)
+    owner_id = Column(Integer, ForeignKey("owners.id"))
+    is_deleted = Column(String(1), default='N')
+    owner = relationship(Owner)
+    comments = relationship(Comment)
+    item_tags = relationship(ItemTag)
+    attributes = relationship(Attribute)
+
+    def to_dict(self, fields=None, hydrates=None, app=None):
+        fields = fields or ["id", "name", "status", "price", "quantity", "created_at", "due_on", "owner_id"]
+        result = {}
+        for field in fields:
+            value = getattr(self, field)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            elif value is not None and field == "price":
+                value = float(value)
+            result[field] = value
+        return result
+
+
+def get_session(rows):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    started = datetime(2020, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(Owner.__table__.insert(), [
+            {"id": i, "name": "owner%d" % i, "app": "bench"} for i in range(1, 101)
+        ])
+        connection.execute(Tag.__table__.insert(), [
+            {"id": i, "name": "tag%d" % i, "app": "bench"} for i in range(1, 51)
+        ])
+        connection.execute(Item.__table__.insert(), [{
+            "id": i,
+            "name": "item%d" % i,
+            "status": STATUSES[i % len(STATUSES)],
+            "price": i % 1000 + 0.99,
+            "quantity": i % 50,
+            "created_at": started + timedelta(minutes=i),
+            "due_on": (started + timedelta(days=i % 365)).date(),
+            "owner_id": i % 100 + 1,
+            "is_deleted": 'N',
+        } for i in range(1, rows + 1)])
+        connection.execute(ItemTag.__table__.insert(), [
+            {"item_id": i, "tag_id": (i + j) % 50 + 1, "app": "bench"} for i in range(1, rows + 1) for j in range(2)
+        ])
+        connection.execute(Comment.__table__.insert(), [
+            {"item_id": i, "body": "comment %d" % i, "app": "bench"} for i in range(1, rows + 1)
+        ])
+        connection.execute(Attribute.__table__.insert(), [
+            {"item_id": i, "key": "color", "value": ["red", "green", "blue"][i % 3], "app": "bench"}
+            for i in range(1, rows + 1)
+        ])
+    return Session(engine)
+
+
+def get_filters():
+    return {
+        "default_eq": lambda: DefaultFilter(Item, "status", "open"),
+        "default_in": lambda: DefaultFilter(Item, "id__in", ",".join(str(i) for i in range(1, 200))),
+        "default_range": lambda: DefaultFilter(Item, "price__gte", "100"),
+        "default_contains": lambda: DefaultFilter(Item, "name__contains", "12"),
+        "or": lambda: OrFilter(Item, "name_or_status", "open"),
+        "multi_or": lambda: MultiOrFilter(Item, "status", "open|quantity__gt=40"),
+        "one_to_one": lambda: OneToOneJoinFilter(Item, "owner__name", "owner5").set_secondary_model(
+            Owner
+        ).set_model_to_secondary_relation("owner"),
+        "one_to_many": lambda: OneToManyJoinFilter(Item, "comments__body__contains", "1").set_secondary_model(
+            Comment
+        ).set_model_to_secondary_relation("comments"),
+        "many_to_many": lambda: ManyToManyJoinFilter(Item, "tags__name__in", "tag1,tag2,tag3").set_intermediate_model(
+            ItemTag
+        ).set_secondary_model(
+            Tag
+        ).set_model_to_intermediate_relation(
+            "item_tags"
+        ).set_intermediate_to_secondary_relation("tag"),
+        "key_value": lambda: KeyValueJoinFactory(Item, "attributes__color", "red").set_intermediate_model(
+            Attribute
+        ).set_model_to_intermediate_relation(
+            "attributes"
+        ).set_key_field("key").set_value_field("value"),
+    }
+
+
+def get_es_payload(rows):
+    schema = [
+        {"name": "numeric_id", "type": "long"},
+        {"name": "name", "type": "text"},
+        {"name": "name_q", "type": "text"},
+        {"name": "status", "type": "keyword"},
+        {"name": "price", "type": "double"},
+        {"name": "quantity", "type": "long"},
+    ]
+    datarows = [
+        [i, "item%d" % i, "item%d" % i, STATUSES[i % len(STATUSES)], i % 1000 + 0.99, i % 50]
+        for i in range(1, rows + 1)
+    ]
+    return {"schema": schema, "datarows": datarows, "total": rows, "size": rows, "status": 200}
+
+
+class StubEsServer(object):
+    def __init__(self, rows):
+        body = json.dumps(get_es_payload(rows)).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def get_host(self):
+        return "http://127.0.0.1:%d" % self._server.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
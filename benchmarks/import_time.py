@@ -0,0 +1,61 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "sqlalchemy": "import sqlalchemy.orm",
+    "sql": "import sahandler.query, sahandler.filters",
+    "es": (
+        "import sahandler.query, sahandler.filters\n"
+        "import requests\n"
+        "from sqlalchemy.dialects.mysql import pymysql"
+    ),
+}
+
+PROBE = """
+import sys
+import time
+started = time.perf_counter()
+%s
+elapsed = time.perf_counter() - started
+print(elapsed, int("requests" in sys.modules), int("sqlalchemy.dialects.mysql" in sys.modules))
+"""
+
+
+def measure(statement, repeat):
+    timings = []
+    loaded = None
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", PROBE % statement], universal_newlines=True)
+        elapsed, has_requests, has_mysql = output.split()
+        timings.append(float(elapsed))
+        loaded = {"requests": bool(int(has_requests)), "mysql_dialect": bool(int(has_mysql))}
+    return {"min": min(timings), "median": statistics.median(timings), "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sahandler import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in SCENARIOS.items():
+        results[name] = measure(statement, args.repeat)
+        print("%-12s median %.1fms  min %.1fms  requests=%s mysql_dialect=%s" % (
+            name,
+            results[name]["median"] * 1000,
+            results[name]["min"] * 1000,
+            results[name]["loaded"]["requests"],
+            results[name]["loaded"]["mysql_dialect"],
+        ))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"python": sys.version, "results": results}, fh, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
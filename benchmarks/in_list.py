@@ -0,0 +1,66 @@
+import sys
+import time
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+from sahandler import inlist
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+
+SIZES = [10, 100, 1000, 10000, 100000]
+STRATEGIES = [None, inlist.CHUNKED, inlist.TEMP_TABLE, inlist.JSON]
+ROWS = 200000
+
+Base = declarative_base()
+
+
+class Record(Base):
+    __tablename__ = "records"
+    DEFAULT_FIELDS = ["id"]
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    is_deleted = Column(String(1), default='N')
+
+    def to_dict(self, fields=None, hydrates=None, app=None):
+        return {"id": self.id}
+
+
+def get_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            Record.__table__.insert(),
+            [{"id": i, "name": "record%d" % i, "is_deleted": 'N'} for i in range(1, ROWS + 1)]
+        )
+    return Session(engine)
+
+
+def run(db, strategy, size):
+    value = ",".join(str(i) for i in range(1, size * 2, 2))
+    start = time.perf_counter()
+    f = DefaultFilter(Record, "id__in", value)
+    if strategy:
+        f.set_in_strategy(strategy, threshold=0)
+    handler = QueryHandler(db, Record).set_limit(30).add_filter(f)
+    count = handler.get_count()
+    handler.get_results()
+    return count, time.perf_counter() - start
+
+
+def main():
+    db = get_session()
+    print("%-12s %10s %10s %12s" % ("strategy", "size", "count", "seconds"))
+    for size in SIZES:
+        for strategy in STRATEGIES:
+            try:
+                count, elapsed = run(db, strategy, size)
+                print("%-12s %10d %10d %12.4f" % (strategy or "plain", size, count, elapsed))
+            except Exception as e:
+                db.rollback()
+                print("%-12s %10d %10s %12s" % (strategy or "plain", size, "-", type(e).__name__))
+            db.rollback()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import sqlalchemy
+from sqlalchemy.dialects import sqlite
+from sahandler.query import QueryHandler, EsQueryHandler
+from benchmarks.fixtures import Item, StubEsServer, get_es_payload, get_filters, get_session
+
+PAGE_SIZES = [30, 100, 1000, 5000]
+
+
+def count_records(records):
+    if isinstance(records, dict):
+        return sum(len(group) for group in records.values())
+    return len(records)
+
+
+def count_payload(payload):
+    return count_records(payload["records"])
+
+
+def measure(fn, repeat, count_rows=None):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - started)
+    result = {"min": min(timings), "median": statistics.median(timings)}
+    if count_rows:
+        result["rows"] = count_rows(value)
+        result["rows_per_sec"] = result["rows"] / result["median"]
+    return result
+
+
+def bench_filters(db, repeat):
+    results = {}
+    for name, make_filter in get_filters().items():
+        def build():
+            handler = QueryHandler(db, Item).add_filter(make_filter())
+            handler.get_count_query()
+            return handler.get_query()
+
+        query = build()
+        results["build.%s" % name] = measure(build, repeat)
+        results["compile.%s" % name] = measure(
+            lambda: str(query.statement.compile(dialect=sqlite.dialect())),
+            repeat
+        )
+        results["payload.%s" % name] = measure(
+            lambda: QueryHandler(db, Item).add_filter(make_filter()).get_return_payload(),
+            repeat
+        )
+    return results
+
+
+def bench_pages(db, repeat):
+    results = {}
+    for page_size in PAGE_SIZES:
+        results["get_results.%d" % page_size] = measure(
+            lambda: QueryHandler(db, Item).set_limit(page_size).get_results(),
+            repeat,
+            count_records
+        )
+        results["get_results.grouped.%d" % page_size] = measure(
+            lambda: QueryHandler(db, Item).set_limit(page_size).set_response_key("status").get_results(),
+            repeat,
+            count_records
+        )
+    return results
+
+
+def bench_es(db, repeat):
+    results = {}
+    for page_size in PAGE_SIZES:
+        payload = get_es_payload(page_size)
+
+        def normalize():
+            handler = EsQueryHandler(db, Item).set_fields("name,status,price")
+            handler._results = payload
+            return handler.get_results()
+
+        results["normalize.%d" % page_size] = measure(normalize, repeat, count_payload)
+    with StubEsServer(max(PAGE_SIZES)) as server:
+        results["es_payload.%d" % max(PAGE_SIZES)] = measure(
+            lambda: EsQueryHandler(db, Item).set_es(server.get_host(), None).get_return_payload(),
+            repeat,
+            count_payload
+        )
+    return results
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        previous = baseline["results"].get(name)
+        if not previous:
+            continue
+        ratio = result["median"] / previous["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "faster"
+        print("%-40s %12.6f %12.6f %8.2fx %s" % (name, previous["median"], result["median"], ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sahandler benchmarks")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="compare against a previous JSON result file")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    db = get_session(args.rows)
+    results = {}
+    results.update(bench_filters(db, args.repeat))
+    results.update(bench_pages(db, args.repeat))
+    results.update(bench_es(db, args.repeat))
+    current = {
+        "meta": {
+            "rows": args.rows,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(current, fh, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(json.load(fh), current, args.threshold)
+        return 1 if regressions else 0
+    for name, result in sorted(results.items()):
+        print("%-40s %12.6f %s" % (name, result["median"], "%.0f rows/s" % result["rows_per_sec"]
+                                   if "rows_per_sec" in result else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
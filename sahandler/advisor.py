@@ -0,0 +1,143 @@
+import threading
+from collections import namedtuple
+from sahandler.fulltext import is_fulltext_field
+from sahandler.phonetic import get_phonetic_field
+
+EQUALITY_OPERATORS = ("eq", "in")
+RANGE_OPERATORS = ("gte", "gt", "lte", "lt", "startswith")
+UNINDEXABLE_OPERATORS = {
+    "contains": "leading-wildcard LIKE cannot use a B-tree index",
+    "unlike": "leading-wildcard NOT LIKE cannot use a B-tree index",
+    "endswith": "leading-wildcard LIKE cannot use a B-tree index",
+    "soundex": "SOUNDS LIKE evaluates SOUNDEX() on every row",
+    "exclude": "NOT IN rarely uses an index",
+}
+
+QueryShape = namedtuple("QueryShape", ["table", "equality", "range", "other", "order_by"])
+
+
+def get_table(model):
+    return getattr(model, "__tablename__", None) or getattr(model, "__name__", str(model))
+
+
+class ShapeUsage(object):
+    def __init__(self):
+        self.count = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+
+class UsageRecorder(object):
+    def __init__(self):
+        self._shapes = {}
+        self._lock = threading.Lock()
+
+    def get_shapes(self, handler):
+        columns = {}
+        for f in handler.get_filters():
+            for column, operator in f.get_index_columns():
+                if column is None or operator is None:
+                    continue
+                if operator == "soundex" and get_phonetic_field(f.get_target_model(), column):
+                    column, operator = get_phonetic_field(f.get_target_model(), column), "eq"
+                if operator == "contains" and is_fulltext_field(f.get_target_model(), column):
+                    operator = "search"
+                columns.setdefault(get_table(f.get_target_model()), []).append((column, operator))
+        table = get_table(handler.get_model())
+        order_by = tuple(c for c in handler.get_order_by().split(",") if c)
+        columns.setdefault(table, [])
+        shapes = []
+        for shape_table, shape_columns in columns.items():
+            shapes.append(QueryShape(
+                shape_table,
+                tuple(sorted(set(c for c, o in shape_columns if o in EQUALITY_OPERATORS))),
+                tuple(sorted(set(c for c, o in shape_columns if o in RANGE_OPERATORS))),
+                tuple(sorted(set(
+                    (c, o) for c, o in shape_columns if o not in EQUALITY_OPERATORS and o not in RANGE_OPERATORS
+                ))),
+                order_by if shape_table == table else ()
+            ))
+        return shapes
+
+    def record(self, handler, duration):
+        shapes = self.get_shapes(handler)
+        with self._lock:
+            for shape in shapes:
+                if shape not in self._shapes:
+                    self._shapes[shape] = ShapeUsage()
+                self._shapes[shape].add(duration)
+
+    def get_usage(self):
+        with self._lock:
+            return dict(self._shapes)
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+def propose_index(shape, primary_key="id"):
+    columns = list(shape.equality)
+    columns.extend(c for c in shape.range if c not in columns)
+    columns.extend(c for c in shape.order_by if c not in columns)
+    if not columns or columns == [primary_key]:
+        return None
+    return tuple(columns)
+
+
+def get_report(recorder, primary_key="id"):
+    indexes = {}
+    warnings = {}
+    for shape, usage in recorder.get_usage().items():
+        columns = propose_index(shape, primary_key)
+        if columns:
+            key = (shape.table, columns)
+            proposal = indexes.setdefault(key, {
+                "table": shape.table,
+                "columns": list(columns),
+                "count": 0,
+                "total_duration": 0.0,
+                "max_duration": 0.0,
+                "statement": "CREATE INDEX ix_%s_%s ON %s (%s)" % (
+                    shape.table, "_".join(columns), shape.table, ", ".join(columns)
+                ),
+            })
+            proposal["count"] += usage.count
+            proposal["total_duration"] += usage.total_duration
+            proposal["max_duration"] = max(proposal["max_duration"], usage.max_duration)
+        for column, operator in shape.other:
+            if operator not in UNINDEXABLE_OPERATORS:
+                continue
+            warning = warnings.setdefault((shape.table, column, operator), {
+                "table": shape.table,
+                "column": column,
+                "operator": operator,
+                "reason": UNINDEXABLE_OPERATORS[operator],
+                "count": 0,
+            })
+            warning["count"] += usage.count
+    for proposal in indexes.values():
+        proposal["average_duration"] = proposal["total_duration"] / proposal["count"]
+    return {
+        "indexes": sorted(indexes.values(), key=lambda i: i["total_duration"], reverse=True),
+        "warnings": sorted(warnings.values(), key=lambda w: w["count"], reverse=True),
+    }
+
+
+def format_report(report):
+    lines = ["Proposed indexes:"]
+    for index in report["indexes"]:
+        lines.append("  %s;  -- %d queries, %.3fs total, %.3fs max" % (
+            index["statement"], index["count"], index["total_duration"], index["max_duration"]
+        ))
+    lines.append("Unindexable filters:")
+    for warning in report["warnings"]:
+        lines.append("  %s.%s__%s: %s (%d queries)" % (
+            warning["table"], warning["column"], warning["operator"], warning["reason"], warning["count"]
+        ))
+    return "\n".join(lines)
@@ -0,0 +1,70 @@
+import asyncio
+from sqlalchemy.orm.exc import NoResultFound
+
+
+class BatchLoader(object):
+    def __init__(self, handler_factory, fields=None, hydrates=None, max_batch_size=1000, executor=None):
+        self._handler_factory = handler_factory
+        self._fields = fields
+        self._hydrates = hydrates
+        self._max_batch_size = max_batch_size
+        self._executor = executor
+        self._futures = {}
+        self._pending = []
+        self._scheduled = False
+        self._lock = None
+
+    async def load(self, id):
+        result = await self.get_future(id)
+        if isinstance(result, NoResultFound):
+            raise result
+        return result
+
+    async def load_many(self, ids):
+        ids = list(ids)
+        return dict(zip(ids, await asyncio.gather(*[self.get_future(i) for i in ids])))
+
+    def get_future(self, id):
+        future = self._futures.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[id] = loop.create_future()
+            self._pending.append(id)
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self.dispatch)
+        return future
+
+    def dispatch(self):
+        ids = self._pending
+        self._pending = []
+        self._scheduled = False
+        for start in range(0, len(ids), self._max_batch_size):
+            asyncio.ensure_future(self.resolve(ids[start:start + self._max_batch_size]))
+
+    def fetch(self, ids):
+        return self._handler_factory().get_many(ids, self._fields, self._hydrates)
+
+    async def resolve(self, ids):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self._executor, self.fetch, ids)
+            except Exception as e:
+                for i in ids:
+                    future = self._futures.pop(i)
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for i in ids:
+            future = self._futures[i]
+            if not future.done():
+                future.set_result(results[i])
+
+    def clear(self, id=None):
+        if id is None:
+            self._futures = dict((i, f) for i, f in self._futures.items() if not f.done())
+        elif id in self._futures and self._futures[id].done():
+            del self._futures[id]
+        return self
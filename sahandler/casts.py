@@ -0,0 +1,96 @@
+from datetime import date, datetime
+from sqlalchemy import inspect
+from sqlalchemy.types import Boolean, Date, DateTime, Enum, Float, Integer, Numeric
+
+TRUE_VALUES = ("1", "true", "t", "y", "yes")
+FALSE_VALUES = ("0", "false", "f", "n", "no")
+
+_casters = {}
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError("invalid boolean value: %r" % value)
+
+
+def to_date(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+def to_datetime(value):
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    try:
+        return datetime.fromisoformat(value).isoformat(" ")
+    except (TypeError, ValueError):
+        return value
+
+
+def identity(value):
+    return value
+
+
+def resolve_caster(column_type):
+    if isinstance(column_type, Boolean):
+        return to_bool
+    if isinstance(column_type, Integer):
+        return int
+    if isinstance(column_type, (Numeric, Float)):
+        return float
+    if isinstance(column_type, DateTime):
+        return to_datetime
+    if isinstance(column_type, Date):
+        return to_date
+    if isinstance(column_type, Enum):
+        return str
+    return identity
+
+
+def load_casters(model):
+    casters = _casters.get(model)
+    if casters is None:
+        casters = {}
+        for key, column_property in inspect(model).column_attrs.items():
+            casters[key] = resolve_caster(column_property.columns[0].type)
+        _casters[model] = casters
+    return casters
+
+
+def get_caster(col):
+    try:
+        model = col.parent.mapper.class_
+        key = col.key
+    except AttributeError:
+        return resolve_caster(col.type)
+    casters = load_casters(model)
+    caster = casters.get(key)
+    if caster is None:
+        caster = casters[key] = resolve_caster(col.type)
+    return caster
+
+
+def cast_list(col, values):
+    caster = get_caster(col)
+    if caster is identity:
+        return values
+    return list(map(caster, values))
+
+
+def cast(col, value):
+    if isinstance(value, list):
+        return cast_list(col, value)
+    caster = get_caster(col)
+    if caster is identity:
+        return value
+    return caster(value)
@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+from importlib import import_module
+from sqlalchemy.types import Boolean, Date, DateTime, Float, Integer, Numeric
+
+RECORDS = "records"
+ARROW = "arrow"
+NUMPY = "numpy"
+
+INTEGER = "integer"
+FLOAT = "float"
+BOOLEAN = "boolean"
+DATETIME = "datetime"
+DATE = "date"
+STRING = "string"
+
+ES_KINDS = {
+    "long": INTEGER,
+    "integer": INTEGER,
+    "short": INTEGER,
+    "byte": INTEGER,
+    "double": FLOAT,
+    "float": FLOAT,
+    "half_float": FLOAT,
+    "scaled_float": FLOAT,
+    "boolean": BOOLEAN,
+    "date": DATETIME,
+}
+
+NUMPY_DTYPES = {
+    INTEGER: "int64",
+    FLOAT: "float64",
+    BOOLEAN: "bool",
+    DATETIME: "datetime64[us]",
+    DATE: "datetime64[D]",
+    STRING: "object",
+}
+
+MASKED_KINDS = {
+    INTEGER: 0,
+    BOOLEAN: False,
+}
+
+
+def get_kind(column_type):
+    if isinstance(column_type, Boolean):
+        return BOOLEAN
+    if isinstance(column_type, Integer):
+        return INTEGER
+    if isinstance(column_type, (Numeric, Float)):
+        return FLOAT
+    if isinstance(column_type, DateTime):
+        return DATETIME
+    if isinstance(column_type, Date):
+        return DATE
+    return STRING
+
+
+def get_es_kind(es_type):
+    return ES_KINDS.get(es_type, STRING)
+
+
+def parse_es_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        parsed = datetime.fromtimestamp(value / 1000.0, timezone.utc)
+    else:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_es_values(values, kind):
+    if kind == DATETIME:
+        return [parse_es_datetime(v) for v in values]
+    return values
+
+
+def load(module, output_format):
+    try:
+        return import_module(module)
+    except ImportError:
+        raise ImportError("%s is required for the %s output format" % (module, output_format))
+
+
+class ColumnBuilder(object):
+    def __init__(self, names, kinds, output_format):
+        self._names = names
+        self._kinds = kinds
+        self._output_format = output_format
+        self._chunks = [[] for _ in names]
+        if output_format == ARROW:
+            self._pa = load("pyarrow", output_format)
+            self._types = [self.get_arrow_type(kind) for kind in kinds]
+        elif output_format == NUMPY:
+            self._np = load("numpy", output_format)
+        else:
+            raise ValueError("unknown columnar output format: %s" % output_format)
+
+    def get_arrow_type(self, kind):
+        return {
+            INTEGER: self._pa.int64(),
+            FLOAT: self._pa.float64(),
+            BOOLEAN: self._pa.bool_(),
+            DATETIME: self._pa.timestamp("us"),
+            DATE: self._pa.date32(),
+            STRING: self._pa.string(),
+        }[kind]
+
+    def to_arrow(self, values, arrow_type):
+        try:
+            return self._pa.array(values, type=arrow_type)
+        except (self._pa.ArrowInvalid, self._pa.ArrowTypeError):
+            return self._pa.array(values).cast(arrow_type)
+
+    def to_numpy(self, values, kind):
+        if kind in MASKED_KINDS:
+            mask = [v is None for v in values]
+            fill = MASKED_KINDS[kind]
+            return self._np.ma.masked_array(
+                [fill if m else v for v, m in zip(values, mask)], mask=mask, dtype=NUMPY_DTYPES[kind]
+            )
+        return self._np.array(values, dtype=NUMPY_DTYPES[kind])
+
+    def add_columns(self, columns):
+        for index, values in enumerate(columns):
+            if self._output_format == ARROW:
+                self._chunks[index].append(self.to_arrow(values, self._types[index]))
+            else:
+                self._chunks[index].append(self.to_numpy(values, self._kinds[index]))
+
+    def add_rows(self, rows):
+        if rows:
+            self.add_columns(list(zip(*rows)))
+
+    def build(self):
+        if self._output_format == ARROW:
+            return self._pa.table(
+                [self._pa.chunked_array(chunks, type=t) for chunks, t in zip(self._chunks, self._types)],
+                names=self._names
+            )
+        columns = {}
+        for name, kind, chunks in zip(self._names, self._kinds, self._chunks):
+            module = self._np.ma if kind in MASKED_KINDS else self._np
+            if not chunks:
+                columns[name] = module.array([], dtype=NUMPY_DTYPES[kind])
+            elif len(chunks) == 1:
+                columns[name] = chunks[0]
+            else:
+                columns[name] = module.concatenate(chunks)
+        return columns
@@ -0,0 +1,38 @@
+import threading
+from sqlalchemy import literal_column
+
+_columns = {}
+_lock = threading.Lock()
+
+
+def get_custom_column_name(fields):
+    return "%s_%s" % (fields[0], fields[1])
+
+
+def register_column(model, path, column_type):
+    fields = path.split("__") if isinstance(path, str) else list(path)
+    name = get_custom_column_name(fields)
+    expression = literal_column("%s.%s.%s" % (model.__tablename__, fields[0], fields[1]), column_type)
+    global _columns
+    with _lock:
+        if (model, name) in _columns:
+            return _columns[(model, name)]
+        columns = dict(_columns)
+        columns[(model, name)] = expression
+        _columns = columns
+    return expression
+
+
+def get_column(model, name):
+    return _columns.get((model, name))
+
+
+def get_attribute(model, name):
+    column = _columns.get((model, name))
+    if column is None:
+        return getattr(model, name)
+    return column
+
+
+def has_attribute(model, name):
+    return (model, name) in _columns or hasattr(model, name)
@@ -0,0 +1,23 @@
+import hashlib
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def parse_etags(header):
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = parse_etags(if_none_match)
+    return "*" in tags or etag in tags
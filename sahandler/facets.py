@@ -0,0 +1,96 @@
+from sqlalchemy import String, cast, func, inspect, literal, null
+from sqlalchemy.orm import aliased
+
+
+def parse_facets(facets):
+    if not facets:
+        return []
+    return [f for f in dict.fromkeys(facets.split(",")) if f]
+
+
+def get_facet_path(model, facet):
+    fields = facet.split("__")
+    entity = model
+    relationships = []
+    for field in fields[:-1]:
+        relationship = inspect(entity).relationships[field]
+        relationships.append(relationship)
+        entity = relationship.mapper.class_
+    return relationships, getattr(entity, fields[-1])
+
+
+def add_facet_joins(query, model, facet):
+    relationships, column = get_facet_path(model, facet)
+    if not relationships:
+        return query, column
+    parent = model
+    for relationship in relationships:
+        target = aliased(relationship.mapper.class_, name="facet_%s_%s" % (facet, relationship.key))
+        query = query.outerjoin(getattr(parent, relationship.key).of_type(target))
+        parent = target
+    return query, getattr(parent, column.key)
+
+
+def get_facet_query(query, model, primary_key, facets):
+    selects = []
+    for index, facet in enumerate(facets):
+        facet_query, column = add_facet_joins(query, model, facet)
+        values = [cast(null(), get_facet_path(model, f)[1].type) for f in facets]
+        values[index] = column
+        selects.append(facet_query.with_entities(
+            literal(facet, String).label("facet"),
+            *[v.label("value_%d" % i) for i, v in enumerate(values)],
+            func.count(func.distinct(getattr(model, primary_key))).label("count")
+        ).group_by(column).order_by(None))
+    return selects[0].union_all(*selects[1:])
+
+
+def collect_facets(rows, facets):
+    counts = dict((facet, {}) for facet in facets)
+    indexes = dict((facet, index + 1) for index, facet in enumerate(facets))
+    for row in rows:
+        value = row[indexes[row[0]]]
+        counts[row[0]][value] = counts[row[0]].get(value, 0) + row[-1]
+    return counts
+
+
+def merge_facets(counts_list):
+    merged = {}
+    for counts in counts_list:
+        for facet, values in counts.items():
+            merged_values = merged.setdefault(facet, {})
+            for value, count in values.items():
+                merged_values[value] = merged_values.get(value, 0) + count
+    return merged
+
+
+def format_facets(counts, size=None):
+    facets = {}
+    for facet, values in counts.items():
+        buckets = sorted(values.items(), key=lambda v: v[1], reverse=True)
+        if size:
+            buckets = buckets[:size]
+        facets[facet] = [{"value": value, "count": count} for value, count in buckets]
+    return facets
+
+
+def get_es_field(model, facet):
+    _, column = get_facet_path(model, facet)
+    field = facet.replace("__", ".")
+    if isinstance(column.type, String):
+        return "%s.keyword" % field
+    return field
+
+
+def get_es_aggs(model, facets, size=None):
+    return dict(
+        (facet, {"terms": {"field": get_es_field(model, facet), "size": size or 10000}}) for facet in facets
+    )
+
+
+def collect_es_facets(aggregations, facets):
+    counts = {}
+    for facet in facets:
+        buckets = aggregations.get(facet, {}).get("buckets", [])
+        counts[facet] = dict((b["key"], b["doc_count"]) for b in buckets)
+    return counts
@@ -1,21 +1,60 @@
 from abc import ABC, abstractmethod
-from sqlalchemy import *
-from sqlalchemy.orm import aliased
+from sqlalchemy import or_
 from urllib.parse import unquote
+from sahandler import casts, columns, fulltext, inlist, kvindex, phonetic, relations
 
 
 class BaseQueryFilter(ABC):
+    __slots__ = (
+        "_model", "_filter_key", "_filter_value", "_key_fields", "_column", "_operator",
+        "_in_strategy", "_in_threshold", "_in_chunk_size", "_values",
+    )
     is_join_filter = False
+    in_strategy = None
+    in_threshold = 1000
+    in_chunk_size = 1000
 
     def __init__(self, model, filter_key, filter_value):
         self._model = model
         self._filter_key = filter_key
         self._filter_value = filter_value
+        self._key_fields = None
         self._column = None
         self._operator = None
+        self._in_strategy = self.in_strategy
+        self._in_threshold = self.in_threshold
+        self._in_chunk_size = self.in_chunk_size
+        self._values = None
+
+    def set_key_fields(self, key_fields):
+        self._key_fields = key_fields
+        return self
+
+    def get_key_fields(self):
+        if self._key_fields is None:
+            self._key_fields = self._filter_key.split("__")
+        return self._key_fields
 
     def is_valid_column(self, model):
-        return hasattr(model, self._column)
+        return columns.has_attribute(model, self._column)
+
+    def get_attribute(self, name):
+        return columns.get_attribute(self._model, name)
+
+    def get_filter_key(self):
+        return self._filter_key
+
+    def get_filter_value(self):
+        return self._filter_value
+
+    def set_values(self, values):
+        self._values = list(values)
+        return self
+
+    def get_values(self):
+        if self._values is None:
+            self._values = self.get_list(self._filter_value)
+        return self._values
 
     def get_column(self):
         return self._column
@@ -23,35 +62,64 @@ class BaseQueryFilter(ABC):
     def get_operator(self):
         return self._operator
 
+    def get_target_model(self):
+        return self._model
+
+    def get_index_columns(self):
+        return [(self.get_column(), self.get_operator())]
+
     def use_custom_column(self, column_type):
-        filter_key_fields = self._filter_key.split('__')
-        custom_column = "%s_%s" % (filter_key_fields[0], filter_key_fields[1])
+        filter_key_fields = self.get_key_fields()
+        custom_column = columns.get_custom_column_name(filter_key_fields)
         self._filter_key = custom_column
         if len(filter_key_fields) > 2:
             self._filter_key = "%s__%s" % (
                 custom_column,
                 filter_key_fields[2]
             )
-        if not hasattr(self._model, custom_column):
-            setattr(
-                self._model,
-                custom_column,
-                Column("`%s`...`%s`" % (filter_key_fields[0], filter_key_fields[1]), column_type)
-            )
+        self._key_fields = None
+        if columns.get_column(self._model, custom_column) is None:
+            columns.register_column(self._model, filter_key_fields[:2], column_type)
         return self
 
     @staticmethod
     def cast(col, value):
-        if isinstance(value, list):
-            if str(col.type) == 'INTEGER':
-                return [int(v) for v in value]
-            elif str(col.type) == 'DECIMAL':
-                return [float(v) for v in value]
-        if str(col.type) == 'INTEGER':
-            return int(value)
-        elif str(col.type) == 'DECIMAL':
-            return float(value)
-        return value
+        return casts.cast(col, value)
+
+    @staticmethod
+    def cast_list(col, values):
+        return casts.cast_list(col, values)
+
+    def set_in_strategy(self, strategy, threshold=None, chunk_size=None):
+        self._in_strategy = strategy
+        if threshold is not None:
+            self._in_threshold = threshold
+        if chunk_size is not None:
+            self._in_chunk_size = chunk_size
+        return self
+
+    def in_list(self, query, col, values):
+        values = self.cast_list(col, values)
+        if not self._in_strategy or len(values) <= self._in_threshold:
+            return col.in_(values)
+        return inlist.in_clause(self._in_strategy, query, col, values, self._in_chunk_size)
+
+    def not_in_list(self, query, col, values):
+        values = self.cast_list(col, values)
+        if not self._in_strategy or len(values) <= self._in_threshold:
+            return col.notin_(values)
+        return inlist.not_in_clause(self._in_strategy, query, col, values, self._in_chunk_size)
+
+    def contains(self, query, col, value):
+        if fulltext.is_fulltext_column(col):
+            return self.search(query, col, value)
+        return col.like("%%%s%%" % str(value))
+
+    def search(self, query, col, value):
+        return fulltext.search_clause(query, col, str(value))
+
+    def soundex(self, query, col, value):
+        return phonetic.soundex_clause(query, col, value)
 
     @staticmethod
     def get_list(value):
@@ -68,103 +136,118 @@ class BaseQueryFilter(ABC):
 
 
 class DefaultFilter(BaseQueryFilter):
+    __slots__ = ()
+
     def add_to_query(self, query):
         if "__" in self._filter_key:
-            self._column, self._operator = self._filter_key.split("__")
+            self._column, self._operator = self.get_key_fields()
             if self.is_valid_column(self._model):
                 if self._operator == "in":
-                    return query.filter(getattr(self._model, self._column).in_(self.cast(
-                        getattr(self._model, self._column),
-                        self.get_list(self._filter_value)
-                    )))
+                    return query.filter(self.in_list(
+                        query,
+                        self.get_attribute(self._column),
+                        self.get_values()
+                    ))
                 if self._operator == "exclude":
-                    return query.filter(getattr(self._model, self._column).notin_(self.cast(
-                        getattr(self._model, self._column),
-                        self.get_list(self._filter_value)
-                    )))
+                    return query.filter(self.not_in_list(
+                        query,
+                        self.get_attribute(self._column),
+                        self.get_values()
+                    ))
                 if self._operator == "contains":
-                    return query.filter(getattr(self._model, self._column).like("%%%s%%" % str(self._filter_value)))
+                    return query.filter(self.contains(query, self.get_attribute(self._column), self._filter_value))
                 if self._operator == "unlike":
-                    return query.filter(getattr(self._model, self._column).notlike("%%%s%%" % str(self._filter_value)))
+                    return query.filter(self.get_attribute(self._column).notlike("%%%s%%" % str(self._filter_value)))
                 if self._operator == "startswith":
-                    return query.filter(getattr(self._model, self._column).like("%s%%" % str(self._filter_value)))
+                    return query.filter(self.get_attribute(self._column).like("%s%%" % str(self._filter_value)))
                 if self._operator == "endswith":
-                    return query.filter(getattr(self._model, self._column).like("%%%s" % str(self._filter_value)))
+                    return query.filter(self.get_attribute(self._column).like("%%%s" % str(self._filter_value)))
                 if self._operator == "soundex":
-                    return query.filter(getattr(self._model, self._column).op("SOUNDS LIKE")(str(self._filter_value)))
+                    return query.filter(self.soundex(query, self.get_attribute(self._column), self._filter_value))
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    return query.filter(self.search(query, self.get_attribute(self._column), self._filter_value))
                 if self._operator == "gte":
-                    return query.filter(getattr(self._model, self._column) >= self.cast(
-                        getattr(self._model, self._column),
+                    return query.filter(self.get_attribute(self._column) >= self.cast(
+                        self.get_attribute(self._column),
                         self._filter_value
                     ))
                 if self._operator == "gt":
-                    return query.filter(getattr(self._model, self._column) > self.cast(
-                        getattr(self._model, self._column),
+                    return query.filter(self.get_attribute(self._column) > self.cast(
+                        self.get_attribute(self._column),
                         self._filter_value
                     ))
                 if self._operator == "lte":
-                    return query.filter(getattr(self._model, self._column) <= self.cast(
-                        getattr(self._model, self._column),
+                    return query.filter(self.get_attribute(self._column) <= self.cast(
+                        self.get_attribute(self._column),
                         self._filter_value
                     ))
                 if self._operator == "lt":
-                    return query.filter(getattr(self._model, self._column) < self.cast(
-                        getattr(self._model, self._column),
+                    return query.filter(self.get_attribute(self._column) < self.cast(
+                        self.get_attribute(self._column),
                         self._filter_value
                     ))
         self._column = self._filter_key
         self._operator = "eq"
-        return query.filter(getattr(self._model, self._filter_key) == self.cast(
-            getattr(self._model, self._column),
+        return query.filter(self.get_attribute(self._filter_key) == self.cast(
+            self.get_attribute(self._column),
             self._filter_value
         ))
 
 
 class OrFilter(BaseQueryFilter):
+    __slots__ = ()
+
+    def get_index_columns(self):
+        return []
+
     def add_to_query(self, query):
         expressions = []
         if "__" in self._filter_key:
-            self._column, self._operator = self._filter_key.split("__")
+            self._column, self._operator = self.get_key_fields()
             columns = self._column.split("_or_")
             for c in columns:
                 if self._operator == "in":
-                    expressions.append(getattr(self._model, c).in_(self.cast(
-                        getattr(self._model, c),
-                        self.get_list(self._filter_value)
-                    )))
+                    expressions.append(self.in_list(
+                        query,
+                        self.get_attribute(c),
+                        self.get_values()
+                    ))
                 if self._operator == "exclude":
-                    expressions.append(getattr(self._model, c).notin_(self.cast(
-                        getattr(self._model, c),
-                        self.get_list(self._filter_value)
-                    )))
+                    expressions.append(self.not_in_list(
+                        query,
+                        self.get_attribute(c),
+                        self.get_values()
+                    ))
                 if self._operator == "contains":
-                    expressions.append(getattr(self._model, c).like("%%%s%%" % str(self._filter_value)))
+                    expressions.append(self.contains(query, self.get_attribute(c), self._filter_value))
                 if self._operator == "unlike":
-                    expressions.append(getattr(self._model, c).notlike("%%%s%%" % str(self._filter_value)))
+                    expressions.append(self.get_attribute(c).notlike("%%%s%%" % str(self._filter_value)))
                 if self._operator == "startswith":
-                    expressions.append(getattr(self._model, c).like("%s%%" % str(self._filter_value)))
+                    expressions.append(self.get_attribute(c).like("%s%%" % str(self._filter_value)))
                 if self._operator == "endswith":
-                    expressions.append(getattr(self._model, c).like("%%%s" % str(self._filter_value)))
+                    expressions.append(self.get_attribute(c).like("%%%s" % str(self._filter_value)))
                 if self._operator == "soundex":
-                    expressions.append(getattr(self._model, c).op("SOUNDS LIKE")(str(self._filter_value)))
+                    expressions.append(self.soundex(query, self.get_attribute(c), self._filter_value))
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    expressions.append(self.search(query, self.get_attribute(c), self._filter_value))
                 if self._operator == "gte":
-                    expressions.append(getattr(self._model, c) >= self.cast(
-                        getattr(self._model, c),
+                    expressions.append(self.get_attribute(c) >= self.cast(
+                        self.get_attribute(c),
                         self._filter_value
                     ))
                 if self._operator == "gt":
-                    expressions.append(getattr(self._model, c) > self.cast(
-                        getattr(self._model, c),
+                    expressions.append(self.get_attribute(c) > self.cast(
+                        self.get_attribute(c),
                         self._filter_value
                     ))
                 if self._operator == "lte":
-                    expressions.append(getattr(self._model, c) <= self.cast(
-                        getattr(self._model, c),
+                    expressions.append(self.get_attribute(c) <= self.cast(
+                        self.get_attribute(c),
                         self._filter_value
                     ))
                 if self._operator == "lt":
-                    expressions.append(getattr(self._model, c) < self.cast(
-                        getattr(self._model, c),
+                    expressions.append(self.get_attribute(c) < self.cast(
+                        self.get_attribute(c),
                         self._filter_value
                     ))
             return query.filter(or_(*expressions))
@@ -172,19 +255,24 @@ class OrFilter(BaseQueryFilter):
         self._operator = "eq"
         columns = self._column.split("_or_")
         for c in columns:
-            expressions.append(getattr(self._model, c) == self.cast(
-                getattr(self._model, c),
+            expressions.append(self.get_attribute(c) == self.cast(
+                self.get_attribute(c),
                 self._filter_value
             ))
         return query.filter(or_(*expressions))
 
 
 class MultiOrFilter(BaseQueryFilter):
+    __slots__ = ()
+
+    def get_index_columns(self):
+        return []
+
     def add_to_query(self, query):
         expressions = []
-        if '|' in self._filter_value:
-            self._filter_key = "%s=%s" % (self._filter_key, self._filter_value)
         filter_conditions = self._filter_key.split('|')
+        if '|' in self._filter_value:
+            filter_conditions = ("%s=%s" % (self._filter_key, self._filter_value)).split('|')
         for filter_condition in filter_conditions:
             if '=' not in filter_condition:
                 continue
@@ -192,56 +280,65 @@ class MultiOrFilter(BaseQueryFilter):
             if "__" in filter_key:
                 self._column, self._operator = filter_key.split("__")
                 if self._operator == "in":
-                    expressions.append(getattr(self._model, self._column).in_(self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.in_list(
+                        query,
+                        self.get_attribute(self._column),
                         self.get_list(filter_value)
-                    )))
+                    ))
                 if self._operator == "exclude":
-                    expressions.append(getattr(self._model, self._column).notin_(self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.not_in_list(
+                        query,
+                        self.get_attribute(self._column),
                         self.get_list(filter_value)
-                    )))
+                    ))
                 if self._operator == "contains":
-                    expressions.append(getattr(self._model, self._column).like("%%%s%%" % str(filter_value)))
+                    expressions.append(self.contains(query, self.get_attribute(self._column), filter_value))
                 if self._operator == "unlike":
-                    expressions.append(getattr(self._model, self._column).notlike("%%%s%%" % str(filter_value)))
+                    expressions.append(self.get_attribute(self._column).notlike("%%%s%%" % str(filter_value)))
                 if self._operator == "startswith":
-                    expressions.append(getattr(self._model, self._column).like("%s%%" % str(filter_value)))
+                    expressions.append(self.get_attribute(self._column).like("%s%%" % str(filter_value)))
                 if self._operator == "endswith":
-                    expressions.append(getattr(self._model, self._column).like("%%%s" % str(filter_value)))
+                    expressions.append(self.get_attribute(self._column).like("%%%s" % str(filter_value)))
                 if self._operator == "soundex":
-                    expressions.append(getattr(self._model, self._column).op("SOUNDS LIKE")(str(filter_value)))
+                    expressions.append(self.soundex(query, self.get_attribute(self._column), filter_value))
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    expressions.append(self.search(query, self.get_attribute(self._column), filter_value))
                 if self._operator == "gte":
-                    expressions.append(getattr(self._model, self._column) >= self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.get_attribute(self._column) >= self.cast(
+                        self.get_attribute(self._column),
                         filter_value
                     ))
                 if self._operator == "gt":
-                    expressions.append(getattr(self._model, self._column) > self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.get_attribute(self._column) > self.cast(
+                        self.get_attribute(self._column),
                         filter_value
                     ))
                 if self._operator == "lte":
-                    expressions.append(getattr(self._model, self._column) <= self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.get_attribute(self._column) <= self.cast(
+                        self.get_attribute(self._column),
                         filter_value
                     ))
                 if self._operator == "lt":
-                    expressions.append(getattr(self._model, self._column) < self.cast(
-                        getattr(self._model, self._column),
+                    expressions.append(self.get_attribute(self._column) < self.cast(
+                        self.get_attribute(self._column),
                         filter_value
                     ))
             else:
                 self._column = filter_key
                 self._operator = "eq"
-                expressions.append(getattr(self._model, self._column) == self.cast(
-                    getattr(self._model, self._column),
+                expressions.append(self.get_attribute(self._column) == self.cast(
+                    self.get_attribute(self._column),
                     filter_value
                 ))
         return query.filter(or_(*expressions))
 
 
 class BaseJoinFilter(BaseQueryFilter):
+    __slots__ = (
+        "_intermediate_model", "_secondary_model", "_intermediate_model_alias", "_secondary_model_alias",
+        "_model_to_intermediate_relation", "_intermediate_to_secondary_relation", "_model_to_secondary_relation",
+        "_default_column", "_app",
+    )
     is_join_filter = True
 
     def __init__(self, model, filter_key, filter_value):
@@ -256,6 +353,9 @@ class BaseJoinFilter(BaseQueryFilter):
         self._default_column = None
         self._app = None
 
+    def get_target_model(self):
+        return self._secondary_model or self._intermediate_model
+
     def set_intermediate_model(self, model):
         self._intermediate_model = model
         return self
@@ -282,33 +382,44 @@ class BaseJoinFilter(BaseQueryFilter):
 
     def get_intermediate_model_alias(self):
         if not self._intermediate_model_alias:
-            self._intermediate_model_alias = aliased(
+            self._intermediate_model_alias = relations.get_alias(
                 self._intermediate_model,
-                name="%s_%s" % (self._intermediate_model.__tablename__, self._filter_key)
+                relations.get_alias_name(self._intermediate_model, self._filter_key)
             )
         return self._intermediate_model_alias
 
     def get_secondary_model_alias(self):
         if not self._secondary_model_alias:
-            self._secondary_model_alias = aliased(
+            self._secondary_model_alias = relations.get_alias(
                 self._secondary_model,
-                name="%s_%s" % (self._secondary_model.__tablename__, self._filter_key)
+                relations.get_alias_name(self._secondary_model, self._filter_key)
             )
         return self._secondary_model_alias
 
+    def get_model_to_intermediate_relation(self):
+        return relations.get_relation(self._model, self._model_to_intermediate_relation)
+
+    def get_model_to_secondary_relation(self):
+        return relations.get_relation(self._model, self._model_to_secondary_relation)
+
+    def get_intermediate_to_secondary_relation(self):
+        return relations.get_relation(self.get_intermediate_model_alias(), self._intermediate_to_secondary_relation)
+
     def set_default_column(self, column):
         self._default_column = column
         return self
 
 
 class OneToOneJoinFilter(BaseJoinFilter):
+    __slots__ = ()
+
     def add_to_query(self, query):
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         self._column = key_fields[1]
         if not self._filter_key.endswith("__exclude"):
             query = query.join(
                 self.get_secondary_model_alias(),
-                getattr(self._model, self._model_to_secondary_relation)
+                self.get_model_to_secondary_relation()
             )
             if self._app:
                 query = query.filter(getattr(self.get_secondary_model_alias(), "app") == self._app)
@@ -317,24 +428,20 @@ class OneToOneJoinFilter(BaseJoinFilter):
             if self.is_valid_column(self._secondary_model):
                 if self._operator == "in":
                     return query.filter(
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).in_(self.cast(
+                        self.in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "exclude":
                     query = query.outerjoin(
                         self.get_secondary_model_alias(),
-                        getattr(self._model, self._model_to_secondary_relation).and_(
-                            getattr(
-                                self.get_secondary_model_alias(), self._column
-                            ).in_(
-                                self.cast(
-                                    getattr(self.get_secondary_model_alias(), self._column),
-                                    self.get_list(self._filter_value)
-                                )
+                        self.get_model_to_secondary_relation().and_(
+                            self.in_list(
+                                query,
+                                getattr(self.get_secondary_model_alias(), self._column),
+                                self.get_values()
                             )
                         )
                     )
@@ -345,7 +452,11 @@ class OneToOneJoinFilter(BaseJoinFilter):
                     )
                 if self._operator == "contains":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).like("%%%s%%" % str(self._filter_value))
+                        self.contains(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
+                        )
                     )
                 if self._operator == "unlike":
                     return query.filter(
@@ -361,9 +472,15 @@ class OneToOneJoinFilter(BaseJoinFilter):
                     )
                 if self._operator == "soundex":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).op(
-                            "SOUNDS LIKE"
-                        )(str(self._filter_value))
+                        self.soundex(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
+                        )
+                    )
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    return query.filter(
+                        self.search(query, getattr(self.get_secondary_model_alias(), self._column), self._filter_value)
                     )
                 if self._operator == "gte":
                     return query.filter(getattr(self.get_secondary_model_alias(), self._column) >= self.cast(
@@ -393,40 +510,38 @@ class OneToOneJoinFilter(BaseJoinFilter):
 
 
 class OneToManyJoinFilter(BaseJoinFilter):
+    __slots__ = ()
+
     def add_to_query(self, query):
         if not self._filter_key.endswith("__exclude"):
             query = query.join(
                 self.get_secondary_model_alias(),
-                getattr(self._model, self._model_to_secondary_relation)
+                self.get_model_to_secondary_relation()
             )
             if self._app:
                 query = query.filter(getattr(self.get_secondary_model_alias(), "app") == self._app)
         if "__" in self._filter_key:
-            key_fields = self._filter_key.split("__")
+            key_fields = self.get_key_fields()
             self._column = key_fields[1]
             if len(key_fields) == 3:
                 self._operator = key_fields[2]
                 if self.is_valid_column(self._secondary_model):
                     if self._operator == "in":
                         return query.filter(
-                            getattr(
-                                self.get_secondary_model_alias(), self._column
-                            ).in_(self.cast(
+                            self.in_list(
+                                query,
                                 getattr(self.get_secondary_model_alias(), self._column),
-                                self.get_list(self._filter_value)
-                            ))
+                                self.get_values()
+                            )
                         )
                     if self._operator == "exclude":
                         query = query.outerjoin(
                             self.get_secondary_model_alias(),
-                            getattr(self._model, self._model_to_secondary_relation).and_(
-                                getattr(
-                                    self.get_secondary_model_alias(), self._column
-                                ).in_(
-                                    self.cast(
-                                        getattr(self.get_secondary_model_alias(), self._column),
-                                        self.get_list(self._filter_value)
-                                    )
+                            self.get_model_to_secondary_relation().and_(
+                                self.in_list(
+                                    query,
+                                    getattr(self.get_secondary_model_alias(), self._column),
+                                    self.get_values()
                                 )
                             )
                         )
@@ -437,8 +552,10 @@ class OneToManyJoinFilter(BaseJoinFilter):
                         )
                     if self._operator == "contains":
                         return query.filter(
-                            getattr(self.get_secondary_model_alias(), self._column).like(
-                                "%%%s%%" % str(self._filter_value)
+                            self.contains(
+                                query,
+                                getattr(self.get_secondary_model_alias(), self._column),
+                                self._filter_value
                             )
                         )
                     if self._operator == "unlike":
@@ -461,9 +578,19 @@ class OneToManyJoinFilter(BaseJoinFilter):
                         )
                     if self._operator == "soundex":
                         return query.filter(
-                            getattr(self.get_secondary_model_alias(), self._column).op(
-                                "SOUNDS LIKE"
-                            )(str(self._filter_value))
+                            self.soundex(
+                                query,
+                                getattr(self.get_secondary_model_alias(), self._column),
+                                self._filter_value
+                            )
+                        )
+                    if self._operator in fulltext.SEARCH_OPERATORS:
+                        return query.filter(
+                            self.search(
+                                query,
+                                getattr(self.get_secondary_model_alias(), self._column),
+                                self._filter_value
+                            )
                         )
                     if self._operator == "gte":
                         return query.filter(
@@ -500,14 +627,17 @@ class OneToManyJoinFilter(BaseJoinFilter):
             ))
         self._operator = "in"
         return query.filter(
-            getattr(self.get_secondary_model_alias(), self._default_column).in_(self.cast(
+            self.in_list(
+                query,
                 getattr(self.get_secondary_model_alias(), self._default_column),
-                self.get_list(self._filter_value)
-            ))
+                self.get_values()
+            )
         )
 
 
 class OneToManyKeyValueJoinFilter(BaseJoinFilter):
+    __slots__ = ("_key_field", "_value_field")
+
     def __init__(self, model, filter_key, filter_value):
         super().__init__(model, filter_key, filter_value)
         self._key_field = None
@@ -521,14 +651,25 @@ class OneToManyKeyValueJoinFilter(BaseJoinFilter):
         self._value_field = field
         return self
 
+    def get_index_columns(self):
+        return [(self._key_field, "eq"), (self._value_field, self.get_operator())]
+
     def add_to_query(self, query):
+        index = kvindex.get_index(self._model, (self._model_to_secondary_relation,), self._key_field)
+        key_fields = self.get_key_fields()
+        if index is not None and index.is_materialized(key_fields[1], self._value_field):
+            self._column = key_fields[1]
+            self._operator = key_fields[2] if len(key_fields) == 3 else "eq"
+            return query.filter(
+                index.get_clause(self, query, self._column, self._operator, self._filter_value, self._app)
+            )
         query = query.join(
             self.get_secondary_model_alias(),
-            getattr(self._model, self._model_to_secondary_relation)
+            self.get_model_to_secondary_relation()
         )
         if self._app:
             query = query.filter(getattr(self.get_secondary_model_alias(), "app") == self._app)
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         self._column = key_fields[1]
         if len(key_fields) == 3:
             self._operator = key_fields[2]
@@ -537,32 +678,32 @@ class OneToManyKeyValueJoinFilter(BaseJoinFilter):
                     getattr(
                         self.get_secondary_model_alias(), self._key_field
                     ) == self._column,
-                    getattr(
-                        self.get_secondary_model_alias(), self._value_field
-                    ).in_(self.cast(
+                    self.in_list(
+                        query,
                         getattr(self.get_secondary_model_alias(), self._value_field),
-                        self.get_list(self._filter_value)
-                    ))
+                        self.get_values()
+                    )
                 )
             if self._operator == "exclude":
                 return query.filter(
                     getattr(
                         self.get_secondary_model_alias(), self._key_field
                     ) == self._column,
-                    getattr(
-                        self.get_secondary_model_alias(), self._value_field
-                    ).notin_(self.cast(
+                    self.not_in_list(
+                        query,
                         getattr(self.get_secondary_model_alias(), self._value_field),
-                        self.get_list(self._filter_value)
-                    ))
+                        self.get_values()
+                    )
                 )
             if self._operator == "contains":
                 return query.filter(
                     getattr(
                         self.get_secondary_model_alias(), self._key_field
                     ) == self._column,
-                    getattr(self.get_secondary_model_alias(), self._value_field).like(
-                        "%%%s%%" % str(self._filter_value)
+                    self.contains(
+                        query,
+                        getattr(self.get_secondary_model_alias(), self._value_field),
+                        self._filter_value
                     )
                 )
             if self._operator == "unlike":
@@ -597,9 +738,18 @@ class OneToManyKeyValueJoinFilter(BaseJoinFilter):
                     getattr(
                         self.get_secondary_model_alias(), self._key_field
                     ) == self._column,
-                    getattr(self.get_secondary_model_alias(), self._value_field).op(
-                        "SOUNDS LIKE"
-                    )(str(self._filter_value))
+                    self.soundex(
+                        query,
+                        getattr(self.get_secondary_model_alias(), self._value_field),
+                        self._filter_value
+                    )
+                )
+            if self._operator in fulltext.SEARCH_OPERATORS:
+                return query.filter(
+                    getattr(
+                        self.get_secondary_model_alias(), self._key_field
+                    ) == self._column,
+                    self.search(query, getattr(self.get_secondary_model_alias(), self._value_field), self._filter_value)
                 )
             if self._operator == "gte":
                 return query.filter(
@@ -654,45 +804,47 @@ class OneToManyKeyValueJoinFilter(BaseJoinFilter):
 
 
 class OneToOneToManyJoinFilter(BaseJoinFilter):
+    __slots__ = ()
+
     def add_to_query(self, query):
         query = query.join(
             self.get_intermediate_model_alias(),
-            getattr(self._model, self._model_to_intermediate_relation)
+            self.get_model_to_intermediate_relation()
         )
         if self._app:
             query = query.filter(getattr(self.get_intermediate_model_alias(), "app") == self._app)
         query = query.join(
             self.get_secondary_model_alias(),
-            getattr(self.get_intermediate_model_alias(), self._intermediate_to_secondary_relation)
+            self.get_intermediate_to_secondary_relation()
         )
 
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         self._column = key_fields[2]
         if len(key_fields) == 4:
             self._operator = key_fields[3]
             if self.is_valid_column(self._secondary_model):
                 if self._operator == "in":
                     return query.filter(
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).in_(self.cast(
+                        self.in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "exclude":
                     return query.filter(
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).notin_(self.cast(
+                        self.not_in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "contains":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).like(
-                            "%%%s%%" % str(self._filter_value)
+                        self.contains(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
                         )
                     )
                 if self._operator == "unlike":
@@ -715,9 +867,15 @@ class OneToOneToManyJoinFilter(BaseJoinFilter):
                     )
                 if self._operator == "soundex":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).op(
-                            "SOUNDS LIKE"
-                        )(str(self._filter_value))
+                        self.soundex(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
+                        )
+                    )
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    return query.filter(
+                        self.search(query, getattr(self.get_secondary_model_alias(), self._column), self._filter_value)
                     )
                 if self._operator == "gte":
                     return query.filter(
@@ -755,63 +913,60 @@ class OneToOneToManyJoinFilter(BaseJoinFilter):
 
 
 class ManyToManyJoinFilter(BaseJoinFilter):
+    __slots__ = ()
+
     def add_to_query(self, query):
         if not self._filter_key.endswith("__exclude"):
             query = query.join(
                 self.get_intermediate_model_alias(),
-                getattr(self._model, self._model_to_intermediate_relation)
+                self.get_model_to_intermediate_relation()
             )
             if self._app:
                 query = query.filter(getattr(self.get_intermediate_model_alias(), "app") == self._app)
         if not self._filter_key.endswith("__exclude"):
             query = query.join(
                 self.get_secondary_model_alias(),
-                getattr(self.get_intermediate_model_alias(), self._intermediate_to_secondary_relation)
+                self.get_intermediate_to_secondary_relation()
             )
 
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         self._column = key_fields[1]
         if len(key_fields) == 3:
             self._operator = key_fields[2]
             if self.is_valid_column(self._secondary_model):
                 if self._operator == "in":
                     return query.filter(
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).in_(self.cast(
+                        self.in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "exclude":
                     query = query.outerjoin(
                         self.get_intermediate_model_alias(),
-                        getattr(self._model, self._model_to_intermediate_relation)
+                        self.get_model_to_intermediate_relation()
                     )
                     if self._app:
                         query = query.filter(getattr(self.get_intermediate_model_alias(), "app") == self._app)
                     return query.outerjoin(
                         self.get_secondary_model_alias(),
-                        getattr(
-                            self.get_intermediate_model_alias(),
-                            self._intermediate_to_secondary_relation
-                        ).and_(
-                                getattr(
-                                    self.get_secondary_model_alias(), self._column
-                                ).in_(
-                                    self.cast(
-                                        getattr(self.get_secondary_model_alias(), self._column),
-                                        self.get_list(self._filter_value)
-                                    )
-                                )
+                        self.get_intermediate_to_secondary_relation().and_(
+                            self.in_list(
+                                query,
+                                getattr(self.get_secondary_model_alias(), self._column),
+                                self.get_values()
                             )
-                        ).filter(
-                            getattr(self.get_secondary_model_alias(), self._column) == None
                         )
+                    ).filter(
+                        getattr(self.get_secondary_model_alias(), self._column) == None
+                    )
                 if self._operator == "contains":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).like(
-                            "%%%s%%" % str(self._filter_value)
+                        self.contains(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
                         )
                     )
                 if self._operator == "unlike":
@@ -834,9 +989,15 @@ class ManyToManyJoinFilter(BaseJoinFilter):
                     )
                 if self._operator == "soundex":
                     return query.filter(
-                        getattr(self.get_secondary_model_alias(), self._column).op(
-                            "SOUNDS LIKE"
-                        )(str(self._filter_value))
+                        self.soundex(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
+                        )
+                    )
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    return query.filter(
+                        self.search(query, getattr(self.get_secondary_model_alias(), self._column), self._filter_value)
                     )
                 if self._operator == "gte":
                     return query.filter(
@@ -874,6 +1035,8 @@ class ManyToManyJoinFilter(BaseJoinFilter):
 
 
 class ManyToManyKeyValueJoinFilter(BaseJoinFilter):
+    __slots__ = ("_key_field", "_value_field")
+
     def __init__(self, model, filter_key, filter_value):
         super().__init__(model, filter_key, filter_value)
         self._key_field = None
@@ -888,18 +1051,30 @@ class ManyToManyKeyValueJoinFilter(BaseJoinFilter):
         return self
 
     def add_to_query(self, query):
+        index = kvindex.get_index(
+            self._model,
+            (self._model_to_intermediate_relation, self._intermediate_to_secondary_relation),
+            self._key_field
+        )
+        key_fields = self.get_key_fields()
+        if index is not None and len(key_fields) > 2 and index.is_materialized(key_fields[1], key_fields[2]):
+            self._column = key_fields[2]
+            self._operator = key_fields[3] if len(key_fields) == 4 else "eq"
+            return query.filter(
+                index.get_clause(self, query, key_fields[1], self._operator, self._filter_value, self._app)
+            )
         query = query.join(
             self.get_intermediate_model_alias(),
-            getattr(self._model, self._model_to_intermediate_relation)
+            self.get_model_to_intermediate_relation()
         )
         if self._app:
             query = query.filter(getattr(self.get_intermediate_model_alias(), "app") == self._app)
         query = query.join(
             self.get_secondary_model_alias(),
-            getattr(self.get_intermediate_model_alias(), self._intermediate_to_secondary_relation)
+            self.get_intermediate_to_secondary_relation()
         )
 
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         key_value = key_fields[1]
         self._column = key_fields[2]
         if len(key_fields) == 4:
@@ -908,28 +1083,28 @@ class ManyToManyKeyValueJoinFilter(BaseJoinFilter):
                 if self._operator == "in":
                     return query.filter(
                         getattr(self.get_intermediate_model_alias(), self._key_field) == key_value,
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).in_(self.cast(
+                        self.in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "exclude":
                     return query.filter(
                         getattr(self.get_intermediate_model_alias(), self._key_field) == key_value,
-                        getattr(
-                            self.get_secondary_model_alias(), self._column
-                        ).notin_(self.cast(
+                        self.not_in_list(
+                            query,
                             getattr(self.get_secondary_model_alias(), self._column),
-                            self.get_list(self._filter_value)
-                        ))
+                            self.get_values()
+                        )
                     )
                 if self._operator == "contains":
                     return query.filter(
                         getattr(self.get_intermediate_model_alias(), self._key_field) == key_value,
-                        getattr(self.get_secondary_model_alias(), self._column).like(
-                            "%%%s%%" % str(self._filter_value)
+                        self.contains(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
                         )
                     )
                 if self._operator == "unlike":
@@ -956,9 +1131,16 @@ class ManyToManyKeyValueJoinFilter(BaseJoinFilter):
                 if self._operator == "soundex":
                     return query.filter(
                         getattr(self.get_intermediate_model_alias(), self._key_field) == key_value,
-                        getattr(self.get_secondary_model_alias(), self._column).op(
-                            "SOUNDS LIKE"
-                        )(str(self._filter_value))
+                        self.soundex(
+                            query,
+                            getattr(self.get_secondary_model_alias(), self._column),
+                            self._filter_value
+                        )
+                    )
+                if self._operator in fulltext.SEARCH_OPERATORS:
+                    return query.filter(
+                        getattr(self.get_intermediate_model_alias(), self._key_field) == key_value,
+                        self.search(query, getattr(self.get_secondary_model_alias(), self._column), self._filter_value)
                     )
                 if self._operator == "gte":
                     return query.filter(
@@ -1003,6 +1185,8 @@ class ManyToManyKeyValueJoinFilter(BaseJoinFilter):
 
 
 class OneToOneToKeyValueJoinFilter(BaseJoinFilter):
+    __slots__ = ("_key_field", "_value_field")
+
     def __init__(self, model, filter_key, filter_value):
         super().__init__(model, filter_key, filter_value)
         self._key_field = None
@@ -1016,19 +1200,22 @@ class OneToOneToKeyValueJoinFilter(BaseJoinFilter):
         self._value_field = field
         return self
 
+    def get_index_columns(self):
+        return [(self._key_field, "eq"), (self._value_field, self.get_operator())]
+
     def add_to_query(self, query):
         query = query.join(
             self.get_intermediate_model_alias(),
-            getattr(self._model, self._model_to_intermediate_relation)
+            self.get_model_to_intermediate_relation()
         )
         if self._app:
             query = query.filter(getattr(self.get_intermediate_model_alias(), "app") == self._app)
         query = query.join(
             self.get_secondary_model_alias(),
-            getattr(self.get_intermediate_model_alias(), self._intermediate_to_secondary_relation)
+            self.get_intermediate_to_secondary_relation()
         )
 
-        key_fields = self._filter_key.split("__")
+        key_fields = self.get_key_fields()
         key_value = key_fields[2]
         # self._column = key_fields[2]
         if len(key_fields) == 4:
@@ -1036,28 +1223,28 @@ class OneToOneToKeyValueJoinFilter(BaseJoinFilter):
             if self._operator == "in":
                 return query.filter(
                     getattr(self.get_secondary_model_alias(), self._key_field) == key_value,
-                    getattr(
-                        self.get_secondary_model_alias(), self._value_field
-                    ).in_(self.cast(
+                    self.in_list(
+                        query,
                         getattr(self.get_secondary_model_alias(), self._value_field),
-                        self.get_list(self._filter_value)
-                    ))
+                        self.get_values()
+                    )
                 )
             if self._operator == "exclude":
                 return query.filter(
                     getattr(self.get_secondary_model_alias(), self._key_field) == key_value,
-                    getattr(
-                        self.get_secondary_model_alias(), self._value_field
-                    ).notin_(self.cast(
+                    self.not_in_list(
+                        query,
                         getattr(self.get_secondary_model_alias(), self._value_field),
-                        self.get_list(self._filter_value)
-                    ))
+                        self.get_values()
+                    )
                 )
             if self._operator == "contains":
                 return query.filter(
                     getattr(self.get_secondary_model_alias(), self._key_field) == key_value,
-                    getattr(self.get_secondary_model_alias(), self._value_field).like(
-                        "%%%s%%" % str(self._filter_value)
+                    self.contains(
+                        query,
+                        getattr(self.get_secondary_model_alias(), self._value_field),
+                        self._filter_value
                     )
                 )
             if self._operator == "unlike":
@@ -1084,9 +1271,16 @@ class OneToOneToKeyValueJoinFilter(BaseJoinFilter):
             if self._operator == "soundex":
                 return query.filter(
                     getattr(self.get_secondary_model_alias(), self._key_field) == key_value,
-                    getattr(self.get_secondary_model_alias(), self._value_field).op(
-                        "SOUNDS LIKE"
-                    )(str(self._filter_value))
+                    self.soundex(
+                        query,
+                        getattr(self.get_secondary_model_alias(), self._value_field),
+                        self._filter_value
+                    )
+                )
+            if self._operator in fulltext.SEARCH_OPERATORS:
+                return query.filter(
+                    getattr(self.get_secondary_model_alias(), self._key_field) == key_value,
+                    self.search(query, getattr(self.get_secondary_model_alias(), self._value_field), self._filter_value)
                 )
             if self._operator == "gte":
                 return query.filter(
@@ -1131,10 +1325,13 @@ class OneToOneToKeyValueJoinFilter(BaseJoinFilter):
 
 
 class JoinFactory(BaseJoinFilter):
+    __slots__ = ("_key_field", "_value_field", "_strategy")
+
     def __init__(self, model, filter_key, filter_value):
         super().__init__(model, filter_key, filter_value)
         self._key_field = None
         self._value_field = None
+        self._strategy = None
 
     def set_key_field(self, field):
         self._key_field = field
@@ -1144,21 +1341,51 @@ class JoinFactory(BaseJoinFilter):
         self._value_field = field
         return self
 
-    def add_to_query(self, query):
-        key_fields = self._filter_key.split("__")
-        if len(key_fields) == 2 or (
-                len(key_fields) == 3 and
-                key_fields[2] in [
-                    "in", "exclude", "contains", "startswith", "endswith", "soundex", "gte", "gt", "lte", "lt",
-                ]):
-            return OneToManyJoinFilter(self._model, self._filter_key, self._filter_value).set_secondary_model(
+    def get_index_columns(self):
+        if self._strategy is None:
+            return super().get_index_columns()
+        return self._strategy.get_index_columns()
+
+    def is_one_to_many(self, key_fields):
+        return len(key_fields) == 2 or (
+            len(key_fields) == 3 and
+            key_fields[2] in [
+                "in", "exclude", "contains", "startswith", "endswith", "soundex", "search", "match",
+                "gte", "gt", "lte", "lt",
+            ])
+
+    def get_strategy(self):
+        if self._strategy is not None:
+            return self._strategy
+        key_fields = self.get_key_fields()
+        if self.is_one_to_many(key_fields):
+            self._strategy = OneToManyJoinFilter(self._model, self._filter_key, self._filter_value).set_key_fields(
+                key_fields
+            ).set_values(
+                self.get_values()
+            ).set_in_strategy(
+                self._in_strategy,
+                self._in_threshold,
+                self._in_chunk_size
+            ).set_secondary_model(
                 self._intermediate_model
             ).set_model_to_secondary_relation(
                 self._model_to_intermediate_relation
             ).set_default_column(
                 self._value_field
-            ).add_to_query(query)
-        return OneToOneToManyJoinFilter(self._model, self._filter_key, self._filter_value).set_intermediate_model(
+            ).set_app(
+                self._app
+            )
+            return self._strategy
+        self._strategy = OneToOneToManyJoinFilter(self._model, self._filter_key, self._filter_value).set_key_fields(
+            key_fields
+        ).set_values(
+            self.get_values()
+        ).set_in_strategy(
+            self._in_strategy,
+            self._in_threshold,
+            self._in_chunk_size
+        ).set_intermediate_model(
             self._intermediate_model
         ).set_model_to_intermediate_relation(
             self._model_to_intermediate_relation
@@ -1166,31 +1393,34 @@ class JoinFactory(BaseJoinFilter):
             self._secondary_model
         ).set_intermediate_to_secondary_relation(
             self._intermediate_to_secondary_relation
-        ).add_to_query(query)
-
-
-class KeyValueJoinFactory(BaseJoinFilter):
-    def __init__(self, model, filter_key, filter_value):
-        super().__init__(model, filter_key, filter_value)
-        self._key_field = None
-        self._value_field = None
-
-    def set_key_field(self, field):
-        self._key_field = field
-        return self
-
-    def set_value_field(self, field):
-        self._value_field = field
-        return self
+        ).set_app(
+            self._app
+        )
+        return self._strategy
 
     def add_to_query(self, query):
-        key_fields = self._filter_key.split("__")
-        if len(key_fields) == 2 or (
-                len(key_fields) == 3 and
-                key_fields[2] in [
-                    "in", "exclude", "contains", "startswith", "endswith", "soundex", "gte", "gt", "lte", "lt",
-                ]):
-            return OneToManyKeyValueJoinFilter(self._model, self._filter_key, self._filter_value).set_secondary_model(
+        return self.get_strategy().add_to_query(query)
+
+
+class KeyValueJoinFactory(JoinFactory):
+    __slots__ = ()
+
+    def get_strategy(self):
+        if self._strategy is not None:
+            return self._strategy
+        key_fields = self.get_key_fields()
+        if self.is_one_to_many(key_fields):
+            self._strategy = OneToManyKeyValueJoinFilter(
+                self._model, self._filter_key, self._filter_value
+            ).set_key_fields(
+                key_fields
+            ).set_values(
+                self.get_values()
+            ).set_in_strategy(
+                self._in_strategy,
+                self._in_threshold,
+                self._in_chunk_size
+            ).set_secondary_model(
                 self._intermediate_model
             ).set_model_to_secondary_relation(
                 self._model_to_intermediate_relation
@@ -1200,8 +1430,17 @@ class KeyValueJoinFactory(BaseJoinFilter):
                 self._value_field
             ).set_app(
                 self._app
-            ).add_to_query(query)
-        return ManyToManyKeyValueJoinFilter(self._model, self._filter_key, self._filter_value).set_intermediate_model(
+            )
+            return self._strategy
+        self._strategy = ManyToManyKeyValueJoinFilter(self._model, self._filter_key, self._filter_value).set_key_fields(
+            key_fields
+        ).set_values(
+            self.get_values()
+        ).set_in_strategy(
+            self._in_strategy,
+            self._in_threshold,
+            self._in_chunk_size
+        ).set_intermediate_model(
             self._intermediate_model
         ).set_model_to_intermediate_relation(
             self._model_to_intermediate_relation
@@ -1215,4 +1454,5 @@ class KeyValueJoinFactory(BaseJoinFilter):
             self._value_field
         ).set_app(
             self._app
-        ).add_to_query(query)
+        )
+        return self._strategy
@@ -0,0 +1,147 @@
+from collections import namedtuple
+from sqlalchemy import inspect
+from sahandler import columns
+from sahandler.filters import BaseQueryFilter, DefaultFilter, OrFilter, MultiOrFilter
+
+OPERATORS = frozenset([
+    "in", "exclude", "contains", "unlike", "startswith", "endswith", "soundex", "search", "match",
+    "gte", "gt", "lte", "lt",
+])
+LIST_OPERATORS = frozenset(["in", "exclude"])
+
+MAX_CACHE_SIZE = 1024
+
+FilterSpec = namedtuple(
+    "FilterSpec", ["filter_class", "filter_key", "filter_value", "key_fields", "relation", "values"]
+)
+
+_schemas = {}
+_names = {}
+_parse_cache = {}
+
+
+def get_schema(model):
+    schema = _schemas.get(model)
+    if schema is None:
+        schema = _schemas[model] = frozenset(inspect(model).column_attrs.keys())
+    return schema
+
+
+def get_names(model):
+    names = _names.get(model)
+    if names is None:
+        mapper = inspect(model)
+        names = _names[model] = get_schema(model) | frozenset(mapper.relationships.keys())
+    return names
+
+
+def is_valid_key(model, column, operator=None):
+    if operator is not None and operator not in OPERATORS:
+        return False
+    return column in get_schema(model) or columns.get_column(model, column) is not None
+
+
+def is_valid_relation_key(key_fields, settings):
+    fields = key_fields[1:]
+    if fields and fields[-1] in OPERATORS:
+        fields = fields[:-1]
+    if len(fields) > 2:
+        return False
+    models = [settings[name] for name in ("intermediate_model", "secondary_model") if settings.get(name) is not None]
+    if not models:
+        return True
+    unknown = [f for f in fields if not any(f in get_names(m) for m in models)]
+    return len(unknown) <= (1 if "key_field" in settings else 0)
+
+
+def parse_key(model, filter_key, relation_names):
+    cache_key = (model, filter_key, relation_names)
+    parsed = _parse_cache.get(cache_key)
+    if parsed is not None:
+        return parsed
+    key_fields = tuple(filter_key.split("__"))
+    parsed = None
+    if key_fields[0] in relation_names:
+        parsed = (None, key_fields, key_fields[0])
+    elif len(key_fields) <= 2:
+        operator = key_fields[1] if len(key_fields) == 2 else None
+        columns = key_fields[0].split("_or_")
+        if all(is_valid_key(model, c, operator) for c in columns):
+            parsed = (DefaultFilter if len(columns) == 1 else OrFilter, key_fields, None)
+    if parsed is not None and len(_parse_cache) < MAX_CACHE_SIZE:
+        _parse_cache[cache_key] = parsed
+    return parsed
+
+
+def parse_multi_or(model, filter_key, filter_value):
+    for condition in ("%s=%s" % (filter_key, filter_value)).split("|"):
+        if condition.count("=") != 1:
+            return False
+        filter_key, filter_value = condition.split("=")
+        if not filter_key or not filter_value:
+            return False
+        key_fields = filter_key.split("__")
+        if len(key_fields) > 2 or not is_valid_key(model, *key_fields):
+            return False
+    return True
+
+
+class FilterSet(object):
+    def __init__(self, model, specs, relation_map=None):
+        self._model = model
+        self._specs = tuple(specs)
+        self._relation_map = relation_map or {}
+        self._app = None
+
+    @classmethod
+    def from_args(cls, model, args, relation_map=None):
+        relation_map = relation_map or {}
+        relation_names = frozenset(relation_map)
+        specs = []
+        for filter_key, filter_value in args.items():
+            if "|" in str(filter_value):
+                if parse_multi_or(model, filter_key, filter_value):
+                    specs.append(FilterSpec(MultiOrFilter, filter_key, filter_value, None, None, None))
+                continue
+            parsed = parse_key(model, filter_key, relation_names)
+            if parsed is None:
+                continue
+            filter_class, key_fields, relation = parsed
+            if relation:
+                if not is_valid_relation_key(key_fields, relation_map[relation]):
+                    continue
+                filter_class = relation_map[relation]["filter"]
+            values = None
+            if key_fields[-1] in LIST_OPERATORS:
+                values = tuple(BaseQueryFilter.get_list(str(filter_value)))
+            specs.append(FilterSpec(filter_class, filter_key, filter_value, key_fields, relation, values))
+        return cls(model, specs, relation_map)
+
+    def set_app(self, app):
+        self._app = app
+        return self
+
+    def get_specs(self):
+        return self._specs
+
+    def build_filter(self, spec):
+        f = spec.filter_class(self._model, spec.filter_key, spec.filter_value)
+        if spec.key_fields is not None:
+            f.set_key_fields(spec.key_fields)
+        if spec.values is not None:
+            f.set_values(spec.values)
+        if spec.relation:
+            for setting, value in self._relation_map[spec.relation].items():
+                if setting != "filter":
+                    getattr(f, "set_%s" % setting)(value)
+            if self._app:
+                f.set_app(self._app)
+        return f
+
+    def get_filters(self):
+        return [self.build_filter(spec) for spec in self._specs]
+
+    def add_to_handler(self, handler):
+        for f in self.get_filters():
+            handler.add_filter(f)
+        return handler
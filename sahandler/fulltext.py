@@ -0,0 +1,45 @@
+from sqlalchemy import bindparam, column, text
+
+SEARCH_OPERATORS = ("search", "match")
+
+
+def get_entity(col):
+    try:
+        return col.parent.mapper.class_, col.parent.entity
+    except AttributeError:
+        return None, None
+
+
+def is_fulltext_field(model, field):
+    return field in getattr(model, "FULLTEXT_FIELDS", [])
+
+
+def is_fulltext_column(col):
+    model, entity = get_entity(col)
+    return model is not None and is_fulltext_field(model, col.key)
+
+
+def get_dialect_name(query):
+    try:
+        return query.session.get_bind().dialect.name
+    except AttributeError:
+        return None
+
+
+def quote_match_term(value):
+    terms = value.split() or [value]
+    return " ".join('"%s"' % term.replace('"', '""') for term in terms)
+
+
+def search_clause(query, col, value):
+    if get_dialect_name(query) == "sqlite":
+        model, entity = get_entity(col)
+        fulltext_table = getattr(model, "FULLTEXT_TABLE", None)
+        if fulltext_table:
+            primary_key = getattr(model, "FULLTEXT_KEY", "id")
+            return getattr(entity, primary_key).in_(
+                text("SELECT rowid FROM %s WHERE %s MATCH :sahandler_search" % (fulltext_table, col.key)).bindparams(
+                    bindparam("sahandler_search", quote_match_term(value), unique=True)
+                ).columns(column("rowid"))
+            )
+    return col.match(value)
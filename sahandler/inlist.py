@@ -0,0 +1,101 @@
+import json
+from itertools import count
+from sqlalchemy import Column, MetaData, Table, and_, bindparam, column, event, or_, text
+
+CHUNKED = "chunked"
+TEMP_TABLE = "temp_table"
+JSON = "json"
+TEMP_TABLES = "sahandler_in_tables"
+
+_sequence = count()
+
+
+def unique(values):
+    return list(dict.fromkeys(values))
+
+
+def chunks(values, chunk_size):
+    return [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+
+def drop_temp_tables(dbapi_connection, connection_record):
+    tables = connection_record.info.pop(TEMP_TABLES, None)
+    if not tables or dbapi_connection is None:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for table, drop in tables.values():
+            cursor.execute(drop)
+    finally:
+        cursor.close()
+    dbapi_connection.commit()
+
+
+def track_temp_tables(connection):
+    pool = connection.engine.pool
+    if not event.contains(pool, "checkin", drop_temp_tables):
+        event.listen(pool, "checkin", drop_temp_tables)
+    return connection.info.setdefault(TEMP_TABLES, {})
+
+
+def get_drop_statement(connection, table):
+    statement = "DROP TEMPORARY TABLE IF EXISTS %s" if connection.dialect.name == "mysql" else "DROP TABLE IF EXISTS %s"
+    return statement % connection.dialect.identifier_preparer.format_table(table)
+
+
+def get_temp_table(session, col, values):
+    connection = session.connection()
+    tables = track_temp_tables(connection)
+    key = (str(col.type), tuple(values))
+    if key not in tables:
+        table = Table(
+            "_sahandler_in_%d" % next(_sequence),
+            MetaData(),
+            Column("value", col.type, primary_key=True),
+            prefixes=["TEMPORARY"]
+        )
+        table.create(bind=connection)
+        connection.execute(table.insert(), [{"value": v} for v in values])
+        tables[key] = (table, get_drop_statement(connection, table))
+    return tables[key][0].select()
+
+
+def get_json_select(session, col, values):
+    dialect = session.get_bind().dialect
+    if dialect.name == "mysql":
+        statement = "SELECT jt.value FROM JSON_TABLE(:sahandler_in, '$[*]' COLUMNS (value %s PATH '$')) AS jt" % (
+            col.type.compile(dialect=dialect)
+        )
+    elif dialect.name == "postgresql":
+        statement = "SELECT CAST(value AS %s) FROM json_array_elements_text(CAST(:sahandler_in AS json))" % (
+            col.type.compile(dialect=dialect)
+        )
+    elif dialect.name == "sqlite":
+        statement = "SELECT value FROM json_each(:sahandler_in)"
+    else:
+        raise NotImplementedError("JSON IN-list binding is not supported on %s" % dialect.name)
+    return text(statement).bindparams(
+        bindparam("sahandler_in", json.dumps(values), unique=True)
+    ).columns(column("value", col.type))
+
+
+def in_clause(strategy, query, col, values, chunk_size):
+    values = unique(values)
+    if strategy == CHUNKED:
+        return or_(*[col.in_(c) for c in chunks(values, chunk_size)])
+    if strategy == TEMP_TABLE:
+        return col.in_(get_temp_table(query.session, col, values))
+    if strategy == JSON:
+        return col.in_(get_json_select(query.session, col, values))
+    raise ValueError("unknown IN-list strategy: %s" % strategy)
+
+
+def not_in_clause(strategy, query, col, values, chunk_size):
+    values = unique(values)
+    if strategy == CHUNKED:
+        return and_(*[col.notin_(c) for c in chunks(values, chunk_size)])
+    if strategy == TEMP_TABLE:
+        return col.notin_(get_temp_table(query.session, col, values))
+    if strategy == JSON:
+        return col.notin_(get_json_select(query.session, col, values))
+    raise ValueError("unknown IN-list strategy: %s" % strategy)
@@ -0,0 +1,79 @@
+import time
+
+
+class QueryStats(object):
+    def __init__(self, handler):
+        self.model = handler.get_model()
+        self.filter_keys = handler.get_filter_keys()
+        self.stages = []
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def record(self, name, duration, rows=None):
+        self.stages.append((name, duration, rows))
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def get_stage(self, name):
+        for stage in self.stages:
+            if stage[0] == name:
+                return stage
+        return None
+
+    def to_dict(self):
+        return {
+            "model": getattr(self.model, "__tablename__", str(self.model)),
+            "filters": self.filter_keys,
+            "duration": self.duration,
+            "stages": [{"name": n, "duration": d, "rows": r} for n, d, r in self.stages],
+        }
+
+
+class Stage(object):
+    __slots__ = ("_stats", "_name", "_rows", "_started")
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+        self._rows = None
+        self._started = None
+
+    def set_rows(self, rows):
+        self._rows = rows
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stats.record(self._name, time.perf_counter() - self._started, self._rows)
+        return False
+
+
+class NullStage(object):
+    __slots__ = ()
+
+    def set_rows(self, rows):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+def statsd_listener(client, prefix="sahandler"):
+    def listener(stats):
+        name = "%s.%s" % (prefix, getattr(stats.model, "__tablename__", "query"))
+        client.timing("%s.total" % name, stats.duration * 1000)
+        for stage_name, duration, rows in stats.stages:
+            client.timing("%s.%s" % (name, stage_name), duration * 1000)
+            if rows is not None:
+                client.gauge("%s.%s.rows" % (name, stage_name), rows)
+    return listener
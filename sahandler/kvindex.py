@@ -0,0 +1,133 @@
+from sqlalchemy import Column, Index, MetaData, String, Table, case, func, inspect, select
+from sahandler import fulltext
+
+_indexes = {}
+
+
+class KeyValueIndex(object):
+    def __init__(self, model, relations, key_field, value_field, keys, name=None, app_field="app"):
+        self.model = model
+        self.relations = tuple(relations)
+        self.key_field = key_field
+        self.value_field = value_field
+        self.keys = tuple(keys)
+        self.owner = inspect(model).primary_key[0]
+        entities = []
+        entity = model
+        for relation in self.relations:
+            entity = inspect(entity).relationships[relation].mapper.class_
+            entities.append(entity)
+        self.key_entity = entities[0]
+        self.value_entity = entities[-1]
+        self.app_field = app_field if hasattr(self.key_entity, app_field) else None
+        self.name = name or "%s_%s_kv_index" % (model.__tablename__, "_".join(self.relations))
+        self.metadata = MetaData()
+        self.table = self.build_table()
+
+    def get_column_name(self, key):
+        return "kv_%s" % key
+
+    def build_table(self):
+        value_type = getattr(self.value_entity, self.value_field).type
+        columns = [Column(self.owner.key, self.owner.type, primary_key=not self.app_field, index=bool(self.app_field))]
+        if self.app_field:
+            columns.append(Column(self.app_field, String(255)))
+        columns.extend(Column(self.get_column_name(key), value_type) for key in self.keys)
+        table = Table(self.name, self.metadata, *columns)
+        for key in self.keys:
+            index_columns = [table.c[self.get_column_name(key)]]
+            if self.app_field:
+                index_columns.insert(0, table.c[self.app_field])
+            Index("ix_%s_%s" % (self.name, key), *index_columns)
+        return table
+
+    def is_materialized(self, key, value_field):
+        return key in self.keys and value_field == self.value_field
+
+    def get_clause(self, f, query, key, operator, value, app=None):
+        column = self.table.c[self.get_column_name(key)]
+        owners = select(self.table.c[self.owner.key]).where(self.get_value_clause(f, query, column, operator, value))
+        if app and self.app_field:
+            owners = owners.where(self.table.c[self.app_field] == app)
+        return getattr(self.model, self.owner.key).in_(owners)
+
+    def get_value_clause(self, f, query, col, operator, value):
+        if operator == "in":
+            return f.in_list(query, col, f.get_list(value))
+        if operator == "exclude":
+            return f.not_in_list(query, col, f.get_list(value))
+        if operator == "contains":
+            return f.contains(query, col, value)
+        if operator == "unlike":
+            return col.notlike("%%%s%%" % str(value))
+        if operator == "startswith":
+            return col.like("%s%%" % str(value))
+        if operator == "endswith":
+            return col.like("%%%s" % str(value))
+        if operator == "soundex":
+            return f.soundex(query, col, value)
+        if operator in fulltext.SEARCH_OPERATORS:
+            return f.search(query, col, value)
+        if operator == "gte":
+            return col >= f.cast(col, value)
+        if operator == "gt":
+            return col > f.cast(col, value)
+        if operator == "lte":
+            return col <= f.cast(col, value)
+        if operator == "lt":
+            return col < f.cast(col, value)
+        return col == f.cast(col, value)
+
+    def get_source_query(self, session):
+        owner = getattr(self.model, self.owner.key)
+        key_column = getattr(self.key_entity, self.key_field)
+        value_column = getattr(self.value_entity, self.value_field)
+        group_by = [owner]
+        if self.app_field:
+            group_by.append(getattr(self.key_entity, self.app_field))
+        query = session.query(*(group_by + [
+            func.max(case((key_column == key, value_column))).label(self.get_column_name(key)) for key in self.keys
+        ])).select_from(self.model)
+        entity = self.model
+        for relation in self.relations:
+            attribute = getattr(entity, relation)
+            query = query.join(attribute)
+            entity = attribute.property.mapper.class_
+        return query.filter(key_column.in_(self.keys)).group_by(*group_by)
+
+    def create(self, bind):
+        self.table.create(bind, checkfirst=True)
+        return self
+
+    def refresh(self, session, ids=None):
+        delete = self.table.delete()
+        source = self.get_source_query(session)
+        if ids is not None:
+            delete = delete.where(self.table.c[self.owner.key].in_(ids))
+            source = source.filter(getattr(self.model, self.owner.key).in_(ids))
+        session.execute(delete)
+        session.execute(self.table.insert().from_select([c.name for c in self.table.columns], source.statement))
+        return self
+
+
+def register_index(index):
+    _indexes[(index.model, index.relations, index.key_field)] = index
+    return index
+
+
+def unregister_index(index):
+    _indexes.pop((index.model, index.relations, index.key_field), None)
+
+
+def get_index(model, relations, key_field):
+    if not _indexes:
+        return None
+    return _indexes.get((model, relations, key_field))
+
+
+def build_index(session, model, relations, key_field, value_field, keys, name=None):
+    index = KeyValueIndex(model, relations, key_field, value_field, keys, name)
+    index.create(session.get_bind())
+    index.refresh(session)
+    session.commit()
+    return register_index(index)
@@ -0,0 +1,85 @@
+import queue
+import threading
+
+DONE = object()
+
+
+class PageError(object):
+    def __init__(self, error):
+        self.error = error
+
+
+class PagePrefetcher(object):
+    def __init__(self, pages, prefetch=1, poll_interval=0.1):
+        self._pages = pages
+        self._prefetch = prefetch
+        self._poll_interval = poll_interval
+        self._queue = queue.Queue(maxsize=max(prefetch, 1))
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cancel()
+        return False
+
+    def __iter__(self):
+        if self._prefetch <= 0:
+            for page in self._pages:
+                if self._cancelled.is_set():
+                    break
+                yield page
+            return
+        self.start()
+        try:
+            while True:
+                page = self._queue.get()
+                if page is DONE:
+                    return
+                if isinstance(page, PageError):
+                    raise page.error
+                yield page
+        finally:
+            self.cancel()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.produce, daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, item):
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=self._poll_interval)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(self):
+        try:
+            for page in self._pages:
+                if not self.put(page):
+                    break
+            else:
+                self.put(DONE)
+        except Exception as e:
+            self.put(PageError(e))
+        finally:
+            self._pages.close()
+
+    def cancel(self):
+        self._cancelled.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
@@ -0,0 +1,100 @@
+from sqlalchemy import event, func, inspect
+from sahandler.fulltext import get_dialect_name, get_entity
+
+SOUNDEX_CODES = dict(
+    [(c, "1") for c in "BFPV"] +
+    [(c, "2") for c in "CGJKQSXZ"] +
+    [(c, "3") for c in "DT"] +
+    [(c, "4") for c in "L"] +
+    [(c, "5") for c in "MN"] +
+    [(c, "6") for c in "R"]
+)
+
+
+def soundex(value):
+    if value is None:
+        return None
+    letters = [c for c in str(value).upper() if "A" <= c <= "Z"]
+    if not letters:
+        return ""
+    key = letters[0]
+    previous = SOUNDEX_CODES.get(key)
+    for c in letters[1:]:
+        code = SOUNDEX_CODES.get(c)
+        if code is not None and code != previous:
+            key += code
+            if len(key) == 4:
+                break
+        if c not in "HW":
+            previous = code
+    return key.ljust(4, "0")
+
+
+def get_phonetic_field(model, field):
+    return getattr(model, "PHONETIC_FIELDS", {}).get(field)
+
+
+def get_phonetic_column(col):
+    model, entity = get_entity(col)
+    if model is None:
+        return None
+    phonetic_field = get_phonetic_field(model, col.key)
+    if phonetic_field is None:
+        return None
+    return getattr(entity, phonetic_field)
+
+
+def soundex_clause(query, col, value):
+    phonetic_column = get_phonetic_column(col)
+    if phonetic_column is not None:
+        return phonetic_column == soundex(value)
+    if get_dialect_name(query) == "sqlite":
+        return func.soundex(col) == soundex(value)
+    return col.op("SOUNDS LIKE")(str(value))
+
+
+def set_phonetic_keys(model, target):
+    for field, phonetic_field in getattr(model, "PHONETIC_FIELDS", {}).items():
+        setattr(target, phonetic_field, soundex(getattr(target, field)))
+
+
+def track(model):
+    def listener(mapper, connection, target):
+        set_phonetic_keys(model, target)
+    event.listen(model, "before_insert", listener)
+    event.listen(model, "before_update", listener)
+    return model
+
+
+def register_sqlite_function(engine):
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("soundex", 1, soundex)
+    event.listen(engine, "connect", on_connect)
+    return engine
+
+
+def backfill(session, model, batch_size=1000):
+    phonetic_fields = getattr(model, "PHONETIC_FIELDS", {})
+    if not phonetic_fields:
+        return 0
+    primary_key = inspect(model).primary_key[0].key
+    primary_column = getattr(model, primary_key)
+    columns = [primary_column] + [getattr(model, f) for f in phonetic_fields]
+    last = None
+    total = 0
+    while True:
+        query = session.query(*columns).order_by(primary_column)
+        if last is not None:
+            query = query.filter(primary_column > last)
+        rows = query.limit(batch_size).all()
+        if not rows:
+            return total
+        session.bulk_update_mappings(model, [
+            dict(
+                [(primary_key, row[0])] +
+                [(phonetic_field, soundex(value)) for phonetic_field, value in zip(phonetic_fields.values(), row[1:])]
+            ) for row in rows
+        ])
+        session.commit()
+        last = rows[-1][0]
+        total += len(rows)
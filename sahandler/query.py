@@ -1,10 +1,33 @@
-from sqlalchemy import *
+from sqlalchemy import and_, func, inspect, or_
 from sqlalchemy.orm import load_only
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.dialects.mysql import pymysql
+from sahandler import etags
+from sahandler.columnar import RECORDS, ColumnBuilder, get_es_kind, get_kind, parse_es_values
+from sahandler.columns import get_attribute
+from sahandler.facets import (
+    collect_es_facets, collect_facets, format_facets, get_es_aggs, get_facet_query, parse_facets
+)
+from sahandler.inlist import CHUNKED, in_clause
+from sahandler.instrumentation import NULL_STAGE, QueryStats, Stage
+from sahandler.paging import PagePrefetcher
+from sahandler.serializers import dumps
+from sahandler.timeouts import ESTIMATE, QueryTimeoutError, StatementTimeout, estimate_count
+
+from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter, itemgetter
 
-import requests
 import re
+import time
+
+MANY_CHUNK_SIZE = 1000
+ES_TIMEOUT = 30
+
+
+def split_names(names):
+    if isinstance(names, str):
+        return names.split(",")
+    return list(names)
 
 
 class QueryHandler(object):
@@ -26,18 +49,46 @@ class QueryHandler(object):
         self._has_hydration = False
         self._is_soft_deleted = True
         self._primary_key = "id"
+        self._listeners = []
+        self._stats = None
+        self._slow_query_log = None
+        self._usage_recorder = None
+        self._usage_started = None
+        self._router = None
+        self._use_primary = False
+        self._routed = {}
+        self._sessions = {}
+        self._timeouts = {}
+        self._count_fallback = None
+        self._is_estimated_count = False
+        self._output_format = RECORDS
+        self._batch_size = 10000
+        self._facets = []
+        self._facet_size = 10
+        self._serializer = None
+        self._etag_field = None
+        self._fingerprint = None
 
     def set_fields(self, fields):
         if (fields):
-            self._fields = fields.split(",")
+            self._fields = split_names(fields)
         return self
 
     def get_fields(self):
         return self._fields
 
+    def get_model(self):
+        return self._model
+
+    def get_filters(self):
+        return self._filters
+
+    def get_order_by(self):
+        return self._order_by
+
     def set_hydrates(self, hydrates):
         if hydrates:
-            self._hydrates = hydrates.split(",")
+            self._hydrates = split_names(hydrates)
         return self
 
     def set_response_key(self, response_key):
@@ -76,13 +127,128 @@ class QueryHandler(object):
         self._has_hydration = True
         return self
 
+    def set_output_format(self, output_format, batch_size=None):
+        self._output_format = output_format
+        if batch_size:
+            self._batch_size = batch_size
+        return self
+
+    def set_serializer(self, serializer):
+        self._serializer = serializer
+        return self
+
+    def set_etag_field(self, field):
+        self._etag_field = field
+        return self
+
+    def set_facets(self, facets, size=10):
+        self._facets = parse_facets(facets)
+        self._facet_size = size
+        return self
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+        return self
+
+    def stage(self, name):
+        if self._stats is None:
+            return NULL_STAGE
+        return Stage(self._stats, name)
+
+    def start_stats(self):
+        if self._listeners:
+            self._stats = QueryStats(self)
+        if self._usage_recorder is not None:
+            self._usage_started = time.perf_counter()
+
+    def finish_stats(self):
+        if self._usage_recorder is not None:
+            self._usage_recorder.record(self, time.perf_counter() - self._usage_started)
+        if self._stats is not None:
+            stats = self._stats.finish()
+            self._stats = None
+            for listener in self._listeners:
+                listener(stats)
+
+    def set_slow_query_log(self, slow_query_log):
+        self._slow_query_log = slow_query_log
+        return self
+
+    def set_timeout(self, seconds, kind=None):
+        if kind is None:
+            self._timeouts["count"] = seconds
+            self._timeouts["data"] = seconds
+        else:
+            self._timeouts[kind] = seconds
+        return self
+
+    def get_timeout(self, kind):
+        return self._timeouts.get(kind)
+
+    def set_count_fallback(self, fallback=ESTIMATE):
+        self._count_fallback = fallback
+        return self
+
+    def get_fallback_count(self):
+        self._is_estimated_count = True
+        if self._count_fallback == ESTIMATE:
+            return estimate_count(self.get_estimate_query())
+        return self._count_fallback(self)
+
+    def set_router(self, router):
+        self._router = router
+        return self
+
+    def use_primary(self):
+        self._use_primary = True
+        return self
+
+    def get_db(self, kind):
+        if self._router is None or self._use_primary:
+            return self._db
+        if kind not in self._routed:
+            replica = self._router.choose(kind)
+            if replica not in self._sessions:
+                self._sessions[replica] = replica()
+            self._routed[kind] = replica
+        return self._sessions[self._routed[kind]]
+
+    def record_latency(self, kind, started):
+        if kind in self._routed:
+            self._router.record(self._routed[kind], time.perf_counter() - started)
+
+    def close(self):
+        sessions = list(self._sessions.values())
+        for session in sessions:
+            session.close()
+        if self._base_query is not None and self._base_query.session in sessions:
+            self._base_query = None
+        if self._base_count_query is not None and self._base_count_query.session in sessions:
+            self._base_count_query = None
+        self._sessions = {}
+        self._routed = {}
+
+    def set_usage_recorder(self, usage_recorder):
+        self._usage_recorder = usage_recorder
+        return self
+
+    def get_filter_keys(self):
+        return [f.get_filter_key() for f in self._filters]
+
+    def log_slow_query(self, kind, query, started):
+        if self._slow_query_log is None:
+            return
+        duration = time.perf_counter() - started
+        if self._slow_query_log.is_slow(duration):
+            self._slow_query_log.capture(kind, query, duration, self.get_filter_keys())
+
     def set_base_count_query(self, query):
         self._base_count_query = query
         return self
 
     def get_base_count_query(self):
         if not self._base_count_query:
-            self._base_count_query = self._db.query(func.count(func.distinct(getattr(self._model, self._primary_key))))
+            self._base_count_query = self.get_db("count").query(func.count(func.distinct(getattr(self._model, self._primary_key))))
             if self._is_soft_deleted:
                 self._base_count_query = self._base_count_query.filter(getattr(self._model, "is_deleted") == 'N')
             for f in self._filters:
@@ -100,10 +266,13 @@ class QueryHandler(object):
 
     def get_base_query(self):
         if not self._base_query:
-            self._base_query = self._db.query(self._model)
+            self._base_query = self.get_db("data").query(self._model)
             if self._fields:
                 query_fields = list(set(self._fields + self._model.DEFAULT_FIELDS))
-                query_fields = filter(lambda f: f not in getattr(self._model, "FOREIGN_KEY_FIELDS", []), query_fields)
+                columns = inspect(self._model).column_attrs
+                query_fields = [
+                    f for f in query_fields if f in columns and f not in getattr(self._model, "FOREIGN_KEY_FIELDS", [])
+                ]
                 self._base_query = self._base_query.options(load_only(*[getattr(self._model, f) for f in query_fields]))
             if self._is_soft_deleted:
                 self._base_query = self._base_query.filter(getattr(self._model, "is_deleted") == 'N')
@@ -134,6 +303,12 @@ class QueryHandler(object):
         return query
 
     def get_query(self):
+        return self.get_ordered_query().offset(self._offset).limit(self._limit)
+
+    def get_ordered_query(self):
+        return self.get_filtered_query().order_by(*self.get_order_clauses())
+
+    def get_filtered_query(self):
         query = self.get_base_query()
         for f in self._filters:
             if not f.is_join_filter:
@@ -142,62 +317,378 @@ class QueryHandler(object):
                 query = f.add_to_query(query)
             except AttributeError:
                 pass
+        return query
 
+    def get_order_clauses(self):
+        clauses = []
         if ',' in self._order_by and ',' in self._order_dir:
             order_by_fields = self._order_by.split(',')
             order_dir_fields = self._order_dir.split(',')
             for order_by_index, order_by_value in enumerate(order_by_fields):
                 try:
-                    order_func = getattr(getattr(self._model, order_by_value), order_dir_fields[order_by_index])
-                    query = query.order_by(order_func())
+                    order_func = getattr(get_attribute(self._model, order_by_value), order_dir_fields[order_by_index])
+                    clauses.append(order_func())
                 except IndexError:
-                    order_func = getattr(getattr(self._model, order_by_value), 'asc')
-                    query = query.order_by(order_func())
+                    order_func = getattr(get_attribute(self._model, order_by_value), 'asc')
+                    clauses.append(order_func())
         else:
-            order_func = getattr(getattr(self._model, self._order_by), self._order_dir)
-            query = query.order_by(order_func())
+            order_func = getattr(get_attribute(self._model, self._order_by), self._order_dir)
+            clauses.append(order_func())
+        return clauses
+
+    def get_sort_keys(self):
+        order_by_fields = self._order_by.split(',')
+        order_dir_fields = self._order_dir.split(',')
+        sort_keys = []
+        for order_by_index, order_by_value in enumerate(order_by_fields):
+            try:
+                order_dir = order_dir_fields[order_by_index]
+            except IndexError:
+                order_dir = 'asc'
+            sort_keys.append((order_by_value, order_dir == 'desc'))
+        return sort_keys
+
+    def get_keyset_columns(self):
+        sort_keys = self.get_sort_keys()
+        if self._primary_key not in [order_by_value for order_by_value, _ in sort_keys]:
+            sort_keys.append((self._primary_key, False))
+        columns = inspect(self._model).columns
+        for order_by_value, _ in sort_keys:
+            column = columns.get(order_by_value)
+            if column is None or (column.nullable and not column.primary_key):
+                return None
+        return sort_keys
+
+    def get_keyset_clause(self, sort_keys, values):
+        clauses = []
+        for index, (order_by_value, reverse) in enumerate(sort_keys):
+            column = getattr(self._model, order_by_value)
+            conditions = [getattr(self._model, k) == v for (k, _), v in zip(sort_keys[:index], values)]
+            conditions.append(column < values[index] if reverse else column > values[index])
+            clauses.append(and_(*conditions))
+        return or_(*clauses)
+
+    def generate_pages(self, page_size):
+        sort_keys = self.get_keyset_columns()
+        tiebreakers = sort_keys[len(self.get_sort_keys()):] if sort_keys is not None else []
+        offset = self._offset
+        values = None
+        try:
+            while True:
+                query = self.get_ordered_query()
+                for order_by_value, reverse in tiebreakers:
+                    column = getattr(self._model, order_by_value)
+                    query = query.order_by(column.desc() if reverse else column.asc())
+                if values is None:
+                    query = query.offset(offset)
+                else:
+                    query = query.filter(self.get_keyset_clause(sort_keys, values))
+                query = query.distinct().limit(page_size)
+                started = time.perf_counter()
+                with StatementTimeout("data", query, self.get_timeout("data")) as timed_query:
+                    results = timed_query.all()
+                self.record_latency("data", started)
+                self.log_slow_query("data", query, started)
+                if not results:
+                    return
+                if sort_keys is not None:
+                    values = [getattr(results[-1], order_by_value) for order_by_value, _ in sort_keys]
+                offset += len(results)
+                if self._response_key:
+                    yield self.group_results(results)
+                else:
+                    yield self.serialize_results(results)
+                if len(results) < page_size:
+                    return
+        finally:
+            self.close()
+
+    def iter_pages(self, page_size=None, prefetch=1):
+        return PagePrefetcher(self.generate_pages(page_size or self._limit), prefetch)
+
+    def get_etag_field(self):
+        field = self._etag_field or getattr(self._model, "UPDATED_AT_FIELD", "updated_at")
+        return field if hasattr(self._model, field) else None
+
+    def get_fingerprint_query(self):
+        columns = [func.count(func.distinct(getattr(self._model, self._primary_key)))]
+        field = self.get_etag_field()
+        if field:
+            columns.append(func.max(getattr(self._model, field)))
+        return self.get_count_query().with_entities(*columns)
+
+    def get_fingerprint(self):
+        if self._fingerprint is None:
+            try:
+                with self.stage("fingerprint"):
+                    query = self.get_fingerprint_query()
+                    started = time.perf_counter()
+                    with StatementTimeout("count", query, self.get_timeout("count")) as timed_query:
+                        row = timed_query.one()
+                self.record_latency("count", started)
+                self.log_slow_query("count", query, started)
+            finally:
+                self.close()
+            self._fingerprint = (row[0], row[1] if len(row) > 1 else None)
+        return self._fingerprint
+
+    def get_request_key(self):
+        return (
+            getattr(self._model, "__tablename__", self._model),
+            tuple((f.get_filter_key(), f.get_filter_value()) for f in self._filters),
+            tuple(self._fields),
+            tuple(self._hydrates),
+            self._response_key,
+            self._order_by,
+            self._order_dir,
+            self._offset,
+            self._limit,
+            self._app,
+            self._output_format,
+            tuple(self._facets),
+        )
 
-        query = query.offset(self._offset).limit(self._limit)
-        return query
+    def get_etag(self):
+        return etags.make_etag(self.get_request_key(), self.get_fingerprint())
+
+    def get_last_modified(self):
+        return self.get_fingerprint()[1]
+
+    def is_not_modified(self, if_none_match):
+        return etags.matches(if_none_match, self.get_etag())
 
     def get_count(self):
-        return self.get_count_query().scalar()
+        if self._fingerprint is not None:
+            return self._fingerprint[0]
+        with self.stage("build_count"):
+            query = self.get_count_query()
+        with self.stage("count") as stage:
+            started = time.perf_counter()
+            try:
+                with StatementTimeout("count", query, self.get_timeout("count")) as timed_query:
+                    count = timed_query.scalar()
+            except QueryTimeoutError:
+                if self._count_fallback is None:
+                    raise
+                count = self.get_fallback_count()
+            stage.set_rows(count)
+        self.record_latency("count", started)
+        self.log_slow_query("count", query, started)
+        return count
+
+    def get_estimate_query(self):
+        return self.get_count_query().with_entities(getattr(self._model, self._primary_key)).distinct()
+
+    def get_facet_query(self):
+        return get_facet_query(self.get_count_query(), self._model, self._primary_key, self._facets)
+
+    def get_facet_counts(self):
+        with self.stage("facets") as stage:
+            query = self.get_facet_query()
+            started = time.perf_counter()
+            with StatementTimeout("facets", query, self.get_timeout("facets")) as timed_query:
+                rows = timed_query.all()
+            stage.set_rows(len(rows))
+        self.log_slow_query("facets", query, started)
+        return collect_facets(rows, self._facets)
+
+    def get_facets(self):
+        return format_facets(self.get_facet_counts(), self._facet_size)
 
     def get_results(self):
-        results = self.get_query().distinct()
+        if self._output_format != RECORDS:
+            return self.get_columnar_results()
+        results = self.fetch_results()
         if self._response_key:
-            responses = {}
-            for result in results:
-                responses[getattr(result, self._response_key)] = responses.get(getattr(result, self._response_key), [])
-                if self._has_hydration:
-                    if self._app:
-                        responses[getattr(result, self._response_key)].append(
-                            result.to_dict(self._fields, self._hydrates, self._app)
-                        )
-                    else:
-                        responses[getattr(result, self._response_key)].append(
-                            result.to_dict(self._fields, self._hydrates)
-                        )
-                else:
-                    responses[getattr(result, self._response_key)].append(result.to_dict(self._fields))
-            return responses
+            with self.stage("group"):
+                return self.group_results(results)
+        with self.stage("serialize"):
+            return self.serialize_results(results)
+
+    def fetch_results(self):
+        with self.stage("build"):
+            query = self.get_query().distinct()
+        with self.stage("data") as stage:
+            started = time.perf_counter()
+            with StatementTimeout("data", query, self.get_timeout("data")) as timed_query:
+                results = timed_query.all()
+            stage.set_rows(len(results))
+        self.record_latency("data", started)
+        self.log_slow_query("data", query, started)
+        return results
+
+    def iter_grouped_results(self):
+        serialize = self.get_serializer()
+        get_key = attrgetter(self._response_key)
+        self.start_stats()
+        try:
+            with self.stage("build"):
+                query = self.get_filtered_query().order_by(
+                    get_attribute(self._model, self._response_key),
+                    *self.get_order_clauses()
+                ).offset(self._offset).limit(self._limit).distinct()
+            with self.stage("data") as stage:
+                started = time.perf_counter()
+                rows = 0
+                for key, group in groupby(query.yield_per(self._batch_size), get_key):
+                    records = [serialize(result) for result in group]
+                    rows += len(records)
+                    yield key, records
+                stage.set_rows(rows)
+            self.record_latency("data", started)
+            self.log_slow_query("data", query, started)
+        finally:
+            self.finish_stats()
+            self.close()
+
+    def get_column_fields(self):
+        columns = inspect(self._model).column_attrs.keys()
+        if not self._fields:
+            return columns
+        fields = [self._primary_key] + self._fields + self._model.DEFAULT_FIELDS
+        return [f for f in dict.fromkeys(fields) if f in columns]
+
+    def get_columnar_results(self):
+        fields = self.get_column_fields()
+        builder = ColumnBuilder(
+            fields,
+            [get_kind(getattr(self._model, f).type) for f in fields],
+            self._output_format
+        )
+        with self.stage("build"):
+            query = self.get_query().distinct().with_entities(*[getattr(self._model, f) for f in fields])
+        with self.stage("data") as stage:
+            started = time.perf_counter()
+            rows = 0
+            with StatementTimeout("data", query, self.get_timeout("data")) as timed_query:
+                result = timed_query.session.execute(
+                    timed_query.statement,
+                    execution_options={"stream_results": True}
+                )
+                for partition in result.partitions(self._batch_size):
+                    builder.add_rows(partition)
+                    rows += len(partition)
+            stage.set_rows(rows)
+        self.record_latency("data", started)
+        self.log_slow_query("data", query, started)
+        with self.stage("serialize"):
+            return builder.build()
+
+    def serialize_results(self, results):
+        if self._serializer is not None and not self._has_hydration:
+            return list(map(self.get_serializer(), results))
         if self._has_hydration:
             if self._app:
                 return [result.to_dict(self._fields, self._hydrates, self._app) for result in results]
             return [result.to_dict(self._fields, self._hydrates) for result in results]
         return [result.to_dict(self._fields) for result in results]
 
+    def get_serializer(self):
+        if self._serializer is not None and not self._has_hydration:
+            return self._serializer.get_extractor(self._model, self._fields)
+        fields = self._fields
+        hydrates = self._hydrates
+        app = self._app
+        if self._has_hydration:
+            if app:
+                return lambda result: result.to_dict(fields, hydrates, app)
+            return lambda result: result.to_dict(fields, hydrates)
+        return lambda result: result.to_dict(fields)
+
+    def group_results(self, results):
+        serialize = self.get_serializer()
+        get_key = attrgetter(self._response_key)
+        responses = defaultdict(list)
+        for result in results:
+            responses[get_key(result)].append(serialize(result))
+        return dict(responses)
+
+    def get_json_payload(self):
+        payload = self.get_return_payload()
+        if self._serializer is not None:
+            return self._serializer.dumps(payload)
+        return dumps(payload)
+
     def get_return_payload(self):
-        count = self.get_count()
-        results = self.get_results()
-        if self._has_id:
-            if count > 0:
+        self.start_stats()
+        try:
+            count = self.get_count()
+            results = self.get_results()
+            if self._facets and not self._has_id:
+                facets = self.get_facets()
+        finally:
+            self.finish_stats()
+            self.close()
+        if self._has_id and self._output_format == RECORDS:
+            if results:
                 return results[0]
             raise NoResultFound("ID not found")
-        return {
-            "total_count": count,
-            "records": results,
-        }
+        payload = {}
+        if count is not None:
+            payload["total_count"] = count
+        if self._is_estimated_count:
+            payload["is_estimated_count"] = True
+        payload["records"] = results
+        if self._facets and not self._has_id:
+            payload["facets"] = facets
+        return payload
+
+    def get_id_keys(self, ids):
+        try:
+            python_type = getattr(self._model, self._primary_key).type.python_type
+        except NotImplementedError:
+            python_type = None
+        keys = {}
+        for i in ids:
+            if python_type is None or isinstance(i, python_type):
+                keys[i] = i
+                continue
+            try:
+                keys[i] = python_type(i)
+            except (TypeError, ValueError):
+                keys[i] = None
+        return keys
+
+    def get_many_query(self, keys):
+        return self.get_ordered_query().filter(in_clause(
+            CHUNKED,
+            None,
+            getattr(self._model, self._primary_key),
+            [k for k in keys if k is not None],
+            MANY_CHUNK_SIZE
+        )).distinct()
+
+    def key_results(self, keys, results):
+        serialize = self.get_serializer()
+        get_id = attrgetter(self._primary_key)
+        found = dict((get_id(result), serialize(result)) for result in results)
+        return dict(
+            (i, found[key] if key in found else NoResultFound("ID not found: %s" % (i,))) for i, key in keys.items()
+        )
+
+    def get_many(self, ids, fields=None, hydrates=None):
+        self.set_fields(fields)
+        if hydrates:
+            self.set_hydrates(hydrates).use_hydration()
+        keys = self.get_id_keys(ids)
+        if not any(k is not None for k in keys.values()):
+            return self.key_results(keys, [])
+        self.start_stats()
+        try:
+            with self.stage("build"):
+                query = self.get_many_query(keys.values())
+            with self.stage("data") as stage:
+                started = time.perf_counter()
+                with StatementTimeout("data", query, self.get_timeout("data")) as timed_query:
+                    results = timed_query.all()
+                stage.set_rows(len(results))
+            self.record_latency("data", started)
+            self.log_slow_query("data", query, started)
+            with self.stage("serialize"):
+                return self.key_results(keys, results)
+        finally:
+            self.finish_stats()
+            self.close()
 
 
 class EsQueryHandler(QueryHandler):
@@ -217,6 +708,9 @@ class EsQueryHandler(QueryHandler):
         self._id_alias = alias
         return self
 
+    def get_db(self, kind):
+        return self._db
+
     def normalize(self, schema, result):
         normalized = {}
         query_fields = []
@@ -231,34 +725,116 @@ class EsQueryHandler(QueryHandler):
             normalized[normal_key] = result[field_index]
         return normalized
 
+    def get_columnar_results(self):
+        schema = self._results['schema']
+        query_fields = []
+        if self._fields:
+            query_fields = list(set(self._fields + self._model.DEFAULT_FIELDS))
+        indexes = []
+        names = []
+        for field_index, field_key in enumerate(schema):
+            normal_key = "id" if field_key["name"] == self._id_alias else field_key["name"]
+            if normal_key.endswith("_q"):
+                continue
+            if query_fields and normal_key not in query_fields:
+                continue
+            indexes.append(field_index)
+            names.append(normal_key)
+        kinds = [get_es_kind(schema[i]["type"]) for i in indexes]
+        builder = ColumnBuilder(names, kinds, self._output_format)
+        datarows = self._results['datarows']
+        with self.stage("normalize") as stage:
+            for start in range(0, len(datarows), self._batch_size):
+                columns = list(zip(*datarows[start:start + self._batch_size]))
+                builder.add_columns([parse_es_values(columns[i], kind) for i, kind in zip(indexes, kinds)])
+            stage.set_rows(len(datarows))
+            return {
+                "total_count": self._results['total'],
+                "records": builder.build(),
+            }
+
     def get_results(self):
+        if self._output_format != RECORDS:
+            return self.get_columnar_results()
         if self._has_id:
             if self._results['total'] > 0:
                 return self.normalize(self._results['schema'], self._results['datarows'][0])
             raise NoResultFound("ID not found")
-        results = {
-            "total_count": self._results['total'],
-            "records": [self.normalize(self._results['schema'], r) for r in self._results['datarows']]
-        }
+        with self.stage("normalize") as stage:
+            results = {
+                "total_count": self._results['total'],
+                "records": [self.normalize(self._results['schema'], r) for r in self._results['datarows']]
+            }
+            stage.set_rows(len(results["records"]))
         if self._response_key:
-            grouped_results = {
+            with self.stage("group"):
+                get_key = itemgetter(self._response_key)
+                records = defaultdict(list)
+                for record in results["records"]:
+                    records[get_key(record)].append(record)
+            return {
                 "total_count": self._results['total'],
-                "records": {}
+                "records": dict(records),
             }
-            for record in results["records"]:
-                try:
-                    grouped_results["records"][record[self._response_key]].append(record)
-                except KeyError:
-                    grouped_results["records"][record[self._response_key]] = [record]
-            return grouped_results
         return results
 
+    def iter_grouped_results(self):
+        for key, records in self.get_return_payload()["records"].items():
+            yield key, records
+
+    def get_many(self, ids, fields=None, hydrates=None):
+        raise NotImplementedError("EsQueryHandler does not support get_many")
+
+    def get_fingerprint(self):
+        if self._fingerprint is None:
+            import requests
+            field = self.get_etag_field()
+            columns = "COUNT(*), MAX(%s)" % field if field else "COUNT(*)"
+            with self.stage("fingerprint"):
+                response = requests.post(
+                    "%s/_opendistro/_sql" % self._es_host,
+                    json={
+                        "query": self.to_es_sql(self.get_count_query(), columns)
+                    },
+                    auth=self._es_auth,
+                    timeout=self.get_timeout("count") or ES_TIMEOUT
+                )
+                response.raise_for_status()
+            row = response.json()["datarows"][0]
+            self._fingerprint = (row[0], row[1] if len(row) > 1 else None)
+        return self._fingerprint
+
+    def get_es_facets(self, query_text):
+        import requests
+        with self.stage("facets"):
+            explained = requests.post(
+                "%s/_opendistro/_sql/_explain" % self._es_host,
+                json={
+                    "query": query_text
+                },
+                auth=self._es_auth
+            ).json()
+            response = requests.post(
+                "%s/%s/_search" % (self._es_host, self._model.__tablename__),
+                json={
+                    "size": 0,
+                    "query": explained.get("query", {"match_all": {}}),
+                    "aggs": get_es_aggs(self._model, self._facets, self._facet_size),
+                },
+                auth=self._es_auth
+            ).json()
+            return format_facets(collect_es_facets(response.get("aggregations", {}), self._facets), self._facet_size)
+
     def get_query_text(self):
-        query_text = str(self.get_query().statement.compile(
+        return self.to_es_sql(self.get_query())
+
+    def to_es_sql(self, query, columns="*"):
+        from sqlalchemy.dialects.mysql import pymysql
+        query_text = str(query.statement.compile(
             dialect=pymysql.dialect(),
             compile_kwargs={"literal_binds": True}
         ))
-        return re.sub("^SELECT\\s.*\\sFROM", 'SELECT * FROM', query_text, flags=re.DOTALL).replace(
+        return re.sub("^SELECT\\s.*\\sFROM", 'SELECT %s FROM' % columns, query_text, flags=re.DOTALL).replace(
             ' LIKE ', '.keyword LIKE '
         ).replace(
             ' NOT.keyword ', '.keyword NOT '
@@ -277,12 +853,36 @@ class EsQueryHandler(QueryHandler):
         )
 
     def get_return_payload(self):
-        response = requests.post(
-            "%s/_opendistro/_sql" % self._es_host,
-            json={
-                "query": self.get_query_text()
-            },
-            auth=self._es_auth
-        )
-        self._results = response.json()
-        return self.get_results()
+        import requests
+        self.start_stats()
+        try:
+            with self.stage("compile"):
+                query_text = self.get_query_text()
+            with self.stage("request") as stage:
+                started = time.perf_counter()
+                response = requests.post(
+                    "%s/_opendistro/_sql" % self._es_host,
+                    json={
+                        "query": query_text
+                    },
+                    auth=self._es_auth
+                )
+                self._results = response.json()
+                stage.set_rows(self._results.get('total'))
+            if self._slow_query_log is not None:
+                duration = time.perf_counter() - started
+                if self._slow_query_log.is_slow(duration):
+                    self._slow_query_log.add({
+                        "kind": "es",
+                        "duration": duration,
+                        "sql": query_text,
+                        "params": [],
+                        "filters": self.get_filter_keys(),
+                        "explain": None,
+                    })
+            results = self.get_results()
+            if self._facets and not self._has_id:
+                results["facets"] = self.get_es_facets(query_text)
+            return results
+        finally:
+            self.finish_stats()
@@ -0,0 +1,35 @@
+from sqlalchemy.orm import aliased
+
+MAX_CACHE_SIZE = 1024
+
+_relations = {}
+_aliases = {}
+
+
+def get_relation(entity, relation):
+    key = (entity, relation)
+    attribute = _relations.get(key)
+    if attribute is None:
+        attribute = getattr(entity, relation)
+        if len(_relations) < MAX_CACHE_SIZE:
+            _relations[key] = attribute
+    return attribute
+
+
+def get_alias(model, name):
+    key = (model, name)
+    alias = _aliases.get(key)
+    if alias is None:
+        alias = aliased(model, name=name)
+        if len(_aliases) < MAX_CACHE_SIZE:
+            alias = _aliases.setdefault(key, alias)
+    return alias
+
+
+def get_alias_name(model, filter_key):
+    return "%s_%s" % (model.__tablename__, filter_key)
+
+
+def clear():
+    _relations.clear()
+    _aliases.clear()
@@ -0,0 +1,39 @@
+import threading
+from itertools import cycle
+
+ROUND_ROBIN = "round_robin"
+LEAST_LATENCY = "least_latency"
+
+
+class ReplicaRouter(object):
+    def __init__(self, replicas, policy=ROUND_ROBIN, count_replicas=None, decay=0.2):
+        self._replicas = list(replicas)
+        self._count_replicas = list(count_replicas) if count_replicas else self._replicas
+        self._policy = policy
+        self._decay = decay
+        self._latencies = {}
+        self._cycles = {
+            "data": cycle(self._replicas),
+            "count": cycle(self._count_replicas),
+        }
+        self._lock = threading.Lock()
+
+    def get_replicas(self, kind):
+        return self._count_replicas if kind == "count" else self._replicas
+
+    def choose(self, kind):
+        with self._lock:
+            if self._policy == LEAST_LATENCY:
+                return min(self.get_replicas(kind), key=lambda r: self._latencies.get(r, 0.0))
+            return next(self._cycles["count" if kind == "count" else "data"])
+
+    def record(self, replica, duration):
+        with self._lock:
+            previous = self._latencies.get(replica)
+            if previous is None:
+                self._latencies[replica] = duration
+            else:
+                self._latencies[replica] = previous + self._decay * (duration - previous)
+
+    def get_latency(self, replica):
+        return self._latencies.get(replica)
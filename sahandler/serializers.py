@@ -0,0 +1,113 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+from uuid import UUID
+from sqlalchemy import inspect
+from sqlalchemy.types import Date, DateTime, Numeric, Time
+
+MAX_CACHE_SIZE = 256
+
+_encoder = None
+
+
+def to_isoformat(value):
+    return value.isoformat()
+
+
+FORMATTERS = (
+    (DateTime, to_isoformat),
+    (Date, to_isoformat),
+    (Time, to_isoformat),
+    (Numeric, float),
+)
+
+
+def default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError("%r is not JSON serializable" % value)
+
+
+def get_encoder():
+    try:
+        import orjson
+    except ImportError:
+        encoder = json.JSONEncoder(default=default, separators=(",", ":"))
+        return lambda payload: encoder.encode(payload).encode("utf-8")
+    return lambda payload: orjson.dumps(payload, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def skip_none(formatter):
+    return lambda value: None if value is None else formatter(value)
+
+
+class FieldSerializer(object):
+    def __init__(self, formatters=None, encoder=None):
+        self._formatters = tuple(formatters or ()) + FORMATTERS
+        self._encoder = encoder
+        self._extractors = {}
+
+    def get_formatter(self, column_type):
+        for type_class, formatter in self._formatters:
+            if isinstance(column_type, type_class):
+                return formatter
+        return None
+
+    def get_fields(self, model, fields):
+        if not fields:
+            return tuple(inspect(model).column_attrs.keys())
+        return tuple(dict.fromkeys(list(fields) + list(getattr(model, "DEFAULT_FIELDS", []))))
+
+    def build_extractor(self, model, fields):
+        columns = inspect(model).column_attrs
+        names = self.get_fields(model, fields)
+        if any(name not in columns for name in names):
+            fields = list(fields)
+            return lambda result: result.to_dict(fields)
+        formatters = []
+        for index, name in enumerate(names):
+            formatter = self.get_formatter(columns[name].columns[0].type)
+            if formatter is not None:
+                formatters.append((index, skip_none(formatter)))
+        if not names:
+            return lambda result: {}
+        getter = attrgetter(*names)
+        if len(names) == 1:
+            name = names[0]
+            if formatters:
+                formatter = formatters[0][1]
+                return lambda result: {name: formatter(getter(result))}
+            return lambda result: {name: getter(result)}
+        if not formatters:
+            return lambda result: dict(zip(names, getter(result)))
+
+        def extract(result):
+            values = list(getter(result))
+            for index, formatter in formatters:
+                values[index] = formatter(values[index])
+            return dict(zip(names, values))
+        return extract
+
+    def get_extractor(self, model, fields):
+        key = (model, self.get_fields(model, fields))
+        extractor = self._extractors.get(key)
+        if extractor is None:
+            extractor = self.build_extractor(model, fields)
+            if len(self._extractors) < MAX_CACHE_SIZE:
+                self._extractors[key] = extractor
+        return extractor
+
+    def dumps(self, payload):
+        return (self._encoder or dumps)(payload)
+
+
+def dumps(payload):
+    global _encoder
+    if _encoder is None:
+        _encoder = get_encoder()
+    return _encoder(payload)
@@ -0,0 +1,180 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm.exc import NoResultFound
+from sahandler.columnar import RECORDS
+from sahandler.facets import collect_facets, format_facets, merge_facets
+from sahandler.query import QueryHandler
+from sahandler.timeouts import QueryTimeoutError, StatementTimeout
+
+import time
+
+
+class ShardedQueryHandler(QueryHandler):
+    def __init__(self, shards, model):
+        super().__init__(None, model)
+        self._shards = shards
+        self._max_workers = None
+
+    def set_max_workers(self, max_workers):
+        self._max_workers = max_workers
+        return self
+
+    def get_shard_handler(self, shard, offset, limit):
+        handler = QueryHandler(self._shards[shard](), self._model)
+        handler.__dict__.update({
+            "_filters": self._filters,
+            "_fields": self._fields,
+            "_hydrates": self._hydrates,
+            "_order_by": self._order_by,
+            "_order_dir": self._order_dir,
+            "_offset": offset,
+            "_limit": limit,
+            "_app": self._app,
+            "_has_hydration": self._has_hydration,
+            "_is_soft_deleted": self._is_soft_deleted,
+            "_primary_key": self._primary_key,
+            "_slow_query_log": self._slow_query_log,
+            "_timeouts": self._timeouts,
+            "_count_fallback": self._count_fallback,
+            "_facets": self._facets,
+            "_facet_size": self._facet_size,
+            "_etag_field": self._etag_field,
+        })
+        return handler
+
+    def get_db(self, kind):
+        raise NotImplementedError("ShardedQueryHandler runs %s queries through its shard handlers" % kind)
+
+    def set_output_format(self, output_format, batch_size=None):
+        if output_format != RECORDS:
+            raise ValueError("ShardedQueryHandler only supports the %s output format" % RECORDS)
+        return super().set_output_format(output_format, batch_size)
+
+    def get_shard_names(self):
+        if self._app is not None and self._app in self._shards:
+            return [self._app]
+        return list(self._shards)
+
+    def run_query(self, kind, query, method):
+        started = time.perf_counter()
+        with StatementTimeout(kind, query, self.get_timeout(kind)) as timed_query:
+            result = getattr(timed_query, method)()
+        self.log_slow_query(kind, query, started)
+        return result
+
+    def run_count(self, handler, query):
+        try:
+            return self.run_query("count", query, "scalar")
+        except QueryTimeoutError:
+            if self._count_fallback is None:
+                raise
+            return handler.get_fallback_count()
+
+    def get_fingerprint(self):
+        if self._fingerprint is None:
+            handlers = [self.get_shard_handler(s, 0, None) for s in self.get_shard_names()]
+            try:
+                with self.stage("fingerprint"):
+                    with ThreadPoolExecutor(max_workers=self._max_workers or len(handlers)) as executor:
+                        fingerprints = list(executor.map(lambda h: h.get_fingerprint(), handlers))
+            finally:
+                for h in handlers:
+                    h._db.close()
+            modified = [m for _, m in fingerprints if m is not None]
+            self._fingerprint = (sum(c or 0 for c, _ in fingerprints), max(modified) if modified else None)
+        return self._fingerprint
+
+    def merge_results(self, pages):
+        results = [result for page in pages for result in page]
+        for order_by_value, reverse in reversed(self.get_sort_keys()):
+            results.sort(
+                key=lambda r: (getattr(r, order_by_value) is not None, getattr(r, order_by_value)),
+                reverse=reverse
+            )
+        return results[self._offset:self._offset + self._limit]
+
+    def get_return_payload(self):
+        shard_names = self.get_shard_names()
+        if len(shard_names) == 1:
+            handler = self.get_shard_handler(shard_names[0], self._offset, self._limit)
+            handler.__dict__.update({
+                "_response_key": self._response_key,
+                "_listeners": self._listeners,
+                "_usage_recorder": self._usage_recorder,
+                "_serializer": self._serializer,
+            })
+            try:
+                return handler.get_return_payload()
+            finally:
+                handler._db.close()
+        self.start_stats()
+        handlers = [self.get_shard_handler(s, 0, self._offset + self._limit) for s in shard_names]
+        try:
+            with self.stage("build"):
+                count_queries = [h.get_count_query() for h in handlers]
+                data_queries = [h.get_query().distinct() for h in handlers]
+                facet_queries = [h.get_facet_query() for h in handlers] if self._facets else []
+            with ThreadPoolExecutor(max_workers=self._max_workers or len(handlers)) as executor:
+                with self.stage("count") as stage:
+                    counts = list(executor.map(self.run_count, handlers, count_queries))
+                    count = None if None in counts else sum(counts)
+                    stage.set_rows(count)
+                self._is_estimated_count = any(h._is_estimated_count for h in handlers)
+                with self.stage("data") as stage:
+                    pages = list(executor.map(lambda q: self.run_query("data", q, "all"), data_queries))
+                    stage.set_rows(sum(len(p) for p in pages))
+                if facet_queries:
+                    with self.stage("facets"):
+                        facet_rows = executor.map(lambda q: self.run_query("facets", q, "all"), facet_queries)
+                        facets = format_facets(
+                            merge_facets([collect_facets(rows, self._facets) for rows in facet_rows]),
+                            self._facet_size
+                        )
+            with self.stage("merge"):
+                results = self.merge_results(pages)
+            self._has_id = any(h._has_id for h in handlers)
+            if self._response_key:
+                with self.stage("group"):
+                    results = self.group_results(results)
+            else:
+                with self.stage("serialize"):
+                    results = self.serialize_results(results)
+        finally:
+            self.finish_stats()
+            for h in handlers:
+                h._db.close()
+        if self._has_id:
+            if results:
+                return results[0]
+            raise NoResultFound("ID not found")
+        payload = {}
+        if count is not None:
+            payload["total_count"] = count
+        if self._is_estimated_count:
+            payload["is_estimated_count"] = True
+        payload["records"] = results
+        if self._facets:
+            payload["facets"] = facets
+        return payload
+
+    def get_many(self, ids, fields=None, hydrates=None):
+        self.set_fields(fields)
+        if hydrates:
+            self.set_hydrates(hydrates).use_hydration()
+        keys = self.get_id_keys(ids)
+        if not any(k is not None for k in keys.values()):
+            return self.key_results(keys, [])
+        self.start_stats()
+        handlers = [self.get_shard_handler(s, 0, None) for s in self.get_shard_names()]
+        try:
+            with self.stage("build"):
+                queries = [h.get_many_query(keys.values()) for h in handlers]
+            with ThreadPoolExecutor(max_workers=self._max_workers or len(handlers)) as executor:
+                with self.stage("data") as stage:
+                    pages = list(executor.map(lambda q: self.run_query("data", q, "all"), queries))
+                    stage.set_rows(sum(len(p) for p in pages))
+            with self.stage("serialize"):
+                return self.key_results(keys, [result for page in pages for result in page])
+        finally:
+            self.finish_stats()
+            for h in handlers:
+                h._db.close()
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import deque
+
+EXPLAIN_PREFIXES = {
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def compile_query(query):
+    compiled = query.statement.compile(
+        dialect=query.session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    if compiled.positional:
+        return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+    return str(compiled), compiled.params
+
+
+def explain_query(query, sql, params):
+    prefix = EXPLAIN_PREFIXES.get(query.session.get_bind().dialect.name)
+    if not prefix:
+        return None
+    result = query.session.connection().exec_driver_sql(prefix + sql, params)
+    return [dict(row._mapping) for row in result]
+
+
+class SlowQueryLog(object):
+    def __init__(self, threshold, size=100, explain=True):
+        self._threshold = threshold
+        self._explain = explain
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def get_threshold(self):
+        return self._threshold
+
+    def is_slow(self, duration):
+        return duration >= self._threshold
+
+    def capture(self, kind, query, duration, filter_keys):
+        sql, params = compile_query(query)
+        explain = None
+        if self._explain:
+            try:
+                explain = explain_query(query, sql, params)
+            except Exception as e:
+                explain = "EXPLAIN failed: %s" % e
+        self.add({
+            "kind": kind,
+            "duration": duration,
+            "sql": sql,
+            "params": [str(p) for p in params] if isinstance(params, tuple) else {
+                k: str(v) for k, v in params.items()
+            },
+            "filters": filter_keys,
+            "explain": explain,
+        })
+
+    def add(self, entry):
+        entry["captured_at"] = time.time()
+        with self._lock:
+            self._entries.append(entry)
+
+    def get_entries(self):
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,93 @@
+from sahandler.filterset import FilterSet
+from sahandler.query import QueryHandler
+
+
+class InvalidArgumentError(ValueError):
+    def __init__(self, setting, value, reason):
+        super().__init__("invalid %s %r: %s" % (setting, value, reason))
+        self.setting = setting
+        self.value = value
+
+
+def to_count(value):
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        count = -1
+    if count < 0:
+        raise ValueError("expected a non-negative integer")
+    return count
+
+
+REQUEST_SETTINGS = {
+    "fields": str,
+    "hydrates": str,
+    "response_key": str,
+    "order_by": str,
+    "order_dir": str,
+    "offset": to_count,
+    "limit": to_count,
+}
+
+
+class QueryTemplate(object):
+    def __init__(self, model, relation_map=None, allowed_fields=None, handler_class=QueryHandler, **defaults):
+        self._model = model
+        self._relation_map = dict(relation_map or {})
+        self._allowed_fields = tuple(dict.fromkeys(allowed_fields)) if allowed_fields else None
+        self._handler_class = handler_class
+        prototype = handler_class(None, model)
+        for setting, value in defaults.items():
+            self.apply(prototype, setting, value)
+        self._state = dict(prototype.__dict__)
+
+    @staticmethod
+    def apply(handler, setting, value):
+        method = getattr(handler, "set_%s" % setting, None) or getattr(handler, setting)
+        if value is True:
+            return method()
+        if isinstance(value, tuple):
+            return method(*value)
+        return method(value)
+
+    def get_model(self):
+        return self._model
+
+    def get_relation_map(self):
+        return dict(self._relation_map)
+
+    def clean_fields(self, fields):
+        if self._allowed_fields is None:
+            return fields
+        cleaned = [f for f in (fields or "").split(",") if f in self._allowed_fields]
+        return ",".join(cleaned or self._allowed_fields)
+
+    def new_handler(self, db):
+        handler = self._handler_class.__new__(self._handler_class)
+        handler.__dict__.update(self._state)
+        for key, value in self._state.items():
+            if isinstance(value, (list, dict)):
+                handler.__dict__[key] = type(value)(value)
+        handler._db = db
+        return handler
+
+    def bind(self, db, args=None, app=None):
+        handler = self.new_handler(db)
+        filter_args = {}
+        for key, value in (args or {}).items():
+            if key not in REQUEST_SETTINGS:
+                filter_args[key] = value
+                continue
+            try:
+                setting = REQUEST_SETTINGS[key](value)
+            except ValueError as e:
+                raise InvalidArgumentError(key, value, e) from e
+            getattr(handler, "set_%s" % key)(setting)
+        if self._allowed_fields is not None:
+            handler.set_fields(self.clean_fields(",".join(handler.get_fields())))
+        if app is not None:
+            handler.set_app(app)
+        filter_set = FilterSet.from_args(self._model, filter_args, self._relation_map)
+        if app is not None:
+            filter_set.set_app(app)
+        return filter_set.add_to_handler(handler)
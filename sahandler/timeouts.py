@@ -0,0 +1,80 @@
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sahandler.slowlog import compile_query
+
+ESTIMATE = "estimate"
+MYSQL_TIMEOUT_ERROR = 3024
+POSTGRESQL_TIMEOUT_ERROR = "57014"
+SQLITE_PROGRESS_STEPS = 1000
+
+
+class QueryTimeoutError(Exception):
+    def __init__(self, kind, seconds):
+        super().__init__("%s query exceeded its %.3fs budget" % (kind, seconds))
+        self.kind = kind
+        self.seconds = seconds
+
+
+def is_timeout_error(e):
+    orig = getattr(e, "orig", None)
+    if orig is None:
+        return False
+    if getattr(orig, "pgcode", None) == POSTGRESQL_TIMEOUT_ERROR:
+        return True
+    if orig.args and orig.args[0] == MYSQL_TIMEOUT_ERROR:
+        return True
+    return "interrupted" in str(orig)
+
+
+def estimate_count(query):
+    dialect = query.session.get_bind().dialect.name
+    if dialect not in ("mysql", "postgresql"):
+        return None
+    sql, params = compile_query(query)
+    connection = query.session.connection()
+    if dialect == "mysql":
+        rows = connection.exec_driver_sql("EXPLAIN " + sql, params).mappings().all()
+        if not rows:
+            return 0
+        return int((rows[0]["rows"] or 0) * float(rows[0]["filtered"] or 100) / 100)
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class StatementTimeout(object):
+    def __init__(self, kind, query, seconds):
+        self._kind = kind
+        self._query = query
+        self._seconds = seconds
+        self._dialect = None
+        self._dbapi_connection = None
+        self._savepoint = None
+        if seconds:
+            self._dialect = query.session.get_bind().dialect.name
+
+    def __enter__(self):
+        if self._dialect == "mysql":
+            return self._query.prefix_with("/*+ MAX_EXECUTION_TIME(%d) */" % (self._seconds * 1000), dialect="mysql")
+        if self._dialect == "postgresql":
+            session = self._query.session
+            self._savepoint = session.begin_nested()
+            session.execute(text("SET LOCAL statement_timeout = %d" % (self._seconds * 1000)))
+        elif self._dialect == "sqlite":
+            deadline = time.monotonic() + self._seconds
+            self._dbapi_connection = self._query.session.connection().connection.dbapi_connection
+            self._dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+        return self._query
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._dbapi_connection is not None:
+            self._dbapi_connection.set_progress_handler(None, SQLITE_PROGRESS_STEPS)
+        if self._savepoint is not None:
+            if exc_type is None:
+                self._query.session.execute(text("SET LOCAL statement_timeout = DEFAULT"))
+                self._savepoint.commit()
+            else:
+                self._savepoint.rollback()
+        if exc_type is not None and issubclass(exc_type, DBAPIError) and is_timeout_error(exc_value):
+            raise QueryTimeoutError(self._kind, self._seconds) from exc_value
+        return False
@@ -0,0 +1,105 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, create_engine
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Session, declarative_base, relationship
+from sqlalchemy.pool import StaticPool
+from sahandler import phonetic
+
+Base = declarative_base()
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    app = Column(String(10))
+
+
+class ItemTag(Base):
+    __tablename__ = "item_tags"
+    id = Column(Integer, primary_key=True)
+    item_id = Column(String(10), ForeignKey("items.id"), index=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"))
+    app = Column(String(10))
+    tag = relationship(Tag)
+
+
+class Attribute(Base):
+    __tablename__ = "attributes"
+    id = Column(Integer, primary_key=True)
+    item_id = Column(String(10), ForeignKey("items.id"), index=True)
+    key = Column(String(50))
+    value = Column(String(50))
+    app = Column(String(10))
+
+
+class Record(object):
+    is_deleted = Column(String(1), default="N")
+
+    def to_dict(self, fields=None, *args):
+        return dict((c.key, getattr(self, c.key)) for c in self.__table__.columns if not fields or c.key in fields)
+
+
+class Document(Record, Base):
+    __tablename__ = "documents"
+    FULLTEXT_FIELDS = ["body"]
+    FULLTEXT_TABLE = "documents_fts"
+    id = Column(Integer, primary_key=True)
+    title = Column(String(50))
+    body = Column(String(200))
+
+
+@phonetic.track
+class Person(Record, Base):
+    __tablename__ = "persons"
+    PHONETIC_FIELDS = {"name": "name_soundex"}
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    name_soundex = Column(String(4), index=True)
+
+
+class Item(Base):
+    __tablename__ = "items"
+    DEFAULT_FIELDS = ["id"]
+    id = Column(String(10), primary_key=True)
+    grp = Column(String(10), nullable=False)
+    name = Column(String(50))
+    status = Column(String(10))
+    price = Column(Integer)
+    app = Column(String(10))
+    is_deleted = Column(String(1), default="N")
+    updated_at = Column(DateTime)
+    item_tags = relationship(ItemTag)
+    attributes = relationship(Attribute)
+
+    @hybrid_property
+    def label(self):
+        return "%s:%s" % (self.grp, self.name)
+
+    def to_dict(self, fields=None, *args):
+        columns = [c.key for c in self.__table__.columns] + ["label"]
+        if fields:
+            return dict((c, getattr(self, c)) for c in columns if c in fields or c in self.DEFAULT_FIELDS)
+        return dict((c, getattr(self, c)) for c in columns[:-1])
+
+
+def make_engine(path=None):
+    if path:
+        engine = create_engine("sqlite:///%s" % path, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def add_items(engine, items):
+    session = Session(engine)
+    session.add_all([Item(**item) for item in items])
+    session.commit()
+    session.close()
+
+
+def add_rows(engine, rows):
+    session = Session(engine)
+    session.add_all(rows)
+    session.commit()
+    session.close()
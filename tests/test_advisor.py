@@ -0,0 +1,48 @@
+import unittest
+from sqlalchemy.orm import Session
+from sahandler import advisor
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from tests.models import Document, Item, Person, make_engine
+
+
+class AdvisorTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+
+    def get_handler(self, model, filters):
+        handler = QueryHandler(Session(self.engine), model)
+        for filter_key, filter_value in filters:
+            handler.add_filter(DefaultFilter(model, filter_key, filter_value))
+        handler.get_base_query()
+        return handler
+
+    def get_shapes(self, model, *filters):
+        return advisor.UsageRecorder().get_shapes(self.get_handler(model, filters))
+
+    def get_report(self, model, *filters):
+        recorder = advisor.UsageRecorder()
+        recorder.record(self.get_handler(model, filters), 0.5)
+        return advisor.get_report(recorder)
+
+    def test_shape(self):
+        shape, = self.get_shapes(Item, ("status", "open"), ("price__gte", "3"), ("name__contains", "a"))
+        self.assertEqual(shape.equality, ("status",))
+        self.assertEqual(shape.range, ("price",))
+        self.assertEqual(shape.other, (("name", "contains"),))
+
+    def test_proposals_and_warnings(self):
+        report = self.get_report(Item, ("status", "open"), ("price__gte", "3"), ("name__contains", "a"))
+        self.assertEqual([i["columns"] for i in report["indexes"]], [["status", "price", "id"]])
+        self.assertEqual([(w["column"], w["operator"]) for w in report["warnings"]], [("name", "contains")])
+
+    def test_fulltext_contains_is_not_reported(self):
+        shape, = self.get_shapes(Document, ("body__contains", "apple"), ("title__contains", "a"))
+        self.assertEqual(shape.other, (("body", "search"), ("title", "contains")))
+        report = self.get_report(Document, ("body__contains", "apple"))
+        self.assertEqual(report["warnings"], [])
+
+    def test_phonetic_soundex_is_equality(self):
+        shape, = self.get_shapes(Person, ("name__soundex", "Robert"))
+        self.assertEqual((shape.equality, shape.other), (("name_soundex",), ()))
+        self.assertEqual(self.get_report(Item, ("name__soundex", "Robert"))["warnings"][0]["operator"], "soundex")
@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from unittest import mock
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import NoResultFound
+from sahandler.batching import BatchLoader
+from sahandler.query import EsQueryHandler, QueryHandler
+from tests.models import Item, add_items, make_engine
+
+
+class BatchLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%d" % i, "grp": "g", "name": "n%d" % i} for i in range(10)])
+        self.failures = 0
+
+    def get_handler(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        return QueryHandler(Session(self.engine), Item)
+
+    def get_loader(self, **kwargs):
+        loader = BatchLoader(self.get_handler, **kwargs)
+        loader.fetch = mock.Mock(wraps=loader.fetch)
+        return loader
+
+    def get_batches(self, loader):
+        return [sorted(c[0][0]) for c in loader.fetch.call_args_list]
+
+    def test_loads_are_coalesced(self):
+        loader = self.get_loader()
+
+        async def run():
+            return await asyncio.gather(
+                loader.load("i1"), loader.load("i2"), loader.load("i1"), loader.load_many(["i3", "i2"])
+            )
+
+        first, second, third, many = asyncio.run(run())
+        self.assertEqual((first["id"], second["id"], third["id"]), ("i1", "i2", "i1"))
+        self.assertEqual(sorted(many), ["i2", "i3"])
+        self.assertEqual(self.get_batches(loader), [["i1", "i2", "i3"]])
+
+    def test_dispatch_splits_batches(self):
+        loader = self.get_loader(max_batch_size=2)
+        results = asyncio.run(loader.load_many(["i%d" % i for i in range(5)]))
+        self.assertEqual([results["i%d" % i]["id"] for i in range(5)], ["i%d" % i for i in range(5)])
+        self.assertEqual(self.get_batches(loader), [["i0", "i1"], ["i2", "i3"], ["i4"]])
+
+    def test_missing_ids(self):
+        loader = self.get_loader()
+
+        async def run():
+            many = await loader.load_many(["i1", "missing"])
+            with self.assertRaises(NoResultFound):
+                await loader.load("missing")
+            return many
+
+        many = asyncio.run(run())
+        self.assertEqual(many["i1"]["id"], "i1")
+        self.assertIsInstance(many["missing"], NoResultFound)
+        self.assertEqual(len(self.get_batches(loader)), 1)
+
+    def test_failed_batches_are_dropped(self):
+        loader = self.get_loader()
+        self.failures = 1
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                await loader.load("i1")
+            return await loader.load("i1")
+
+        self.assertEqual(asyncio.run(run())["id"], "i1")
+        self.assertEqual(self.get_batches(loader), [["i1"], ["i1"]])
+
+    def test_results_are_cached_until_cleared(self):
+        loader = self.get_loader()
+
+        async def run():
+            await loader.load("i1")
+            await loader.load("i1")
+            loader.clear("i1")
+            await loader.load("i1")
+
+        asyncio.run(run())
+        self.assertEqual(self.get_batches(loader), [["i1"], ["i1"]])
+
+    def test_fields_accept_lists(self):
+        for fields in ("name", ["name"], ("name",)):
+            result = asyncio.run(self.get_loader(fields=fields).load("i1"))
+            self.assertEqual(result, {"id": "i1", "name": "n1"})
+
+    def test_es_handler_rejects_get_many(self):
+        with self.assertRaises(NotImplementedError):
+            EsQueryHandler(None, Item).get_many(["i1"])
@@ -0,0 +1,57 @@
+import unittest
+from datetime import date, datetime
+from unittest import mock
+from sqlalchemy import Column, Integer, Numeric, String
+from sqlalchemy.orm import Session
+from sahandler import casts
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from tests.models import Item, add_items, make_engine
+
+
+class CasterTest(unittest.TestCase):
+    def test_resolve_caster(self):
+        self.assertIs(casts.resolve_caster(Integer()), int)
+        self.assertIs(casts.resolve_caster(Numeric()), float)
+        self.assertIs(casts.resolve_caster(String()), casts.identity)
+
+    def test_model_casters(self):
+        self.assertEqual(casts.cast(Item.price, "12"), 12)
+        self.assertEqual(casts.cast(Item.name, "12"), "12")
+        self.assertEqual(casts.cast(Item.updated_at, "2020-01-02T03:04:05"), "2020-01-02 03:04:05")
+        self.assertIs(casts.get_caster(Item.price), casts.load_casters(Item)["price"])
+
+    def test_unbound_column(self):
+        self.assertEqual(casts.cast(Column("n", Integer), "3"), 3)
+
+    def test_bool(self):
+        self.assertEqual([casts.to_bool(v) for v in ("Yes", "0", True)], [True, False, True])
+        with self.assertRaises(ValueError):
+            casts.to_bool("maybe")
+
+    def test_dates(self):
+        self.assertEqual(casts.to_date("2020-01-02"), "2020-01-02")
+        self.assertEqual(casts.to_date(date(2020, 1, 2)), "2020-01-02")
+        self.assertEqual(casts.to_date("not a date"), "not a date")
+        self.assertEqual(casts.to_date(20200102), 20200102)
+        self.assertEqual(casts.to_datetime(datetime(2020, 1, 2, 3)), "2020-01-02 03:00:00")
+        self.assertEqual(casts.to_datetime("yesterday"), "yesterday")
+        self.assertIsNone(casts.to_datetime(None))
+
+    def test_lists_are_cast_in_one_pass(self):
+        values = [str(i) for i in range(5000)]
+        with mock.patch.object(casts, "get_caster", wraps=casts.get_caster) as get_caster:
+            self.assertEqual(casts.cast(Item.price, values), list(range(5000)))
+        self.assertEqual(get_caster.call_count, 1)
+        self.assertIs(casts.cast(Item.name, values), values)
+
+
+class FilterCastTest(unittest.TestCase):
+    def test_large_in_list_is_cast(self):
+        engine = make_engine()
+        add_items(engine, [{"id": "i%04d" % i, "grp": "g", "price": i} for i in range(3000)])
+        session = Session(engine)
+        f = DefaultFilter(Item, "price__in", ",".join(str(i) for i in range(0, 3000, 2)))
+        payload = QueryHandler(session, Item).set_limit(1).add_filter(f).get_return_payload()
+        session.close()
+        self.assertEqual(payload["total_count"], 1500)
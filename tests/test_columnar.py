@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sahandler.columnar import ARROW, NUMPY
+from sahandler.filters import DefaultFilter
+from sahandler.query import EsQueryHandler, QueryHandler
+from tests.models import Item, add_items, make_engine
+
+DATES = ["2020-01-01T00:00:00.000Z", "2020-01-01T02:30:00.000+02:00", "2020-01-01 00:00:05", None, 1577836800000]
+EXPECTED = [
+    datetime(2020, 1, 1), datetime(2020, 1, 1, 0, 30), datetime(2020, 1, 1, 0, 0, 5), None, datetime(2020, 1, 1)
+]
+
+
+class EsColumnarTest(unittest.TestCase):
+    def get_records(self, output_format):
+        handler = EsQueryHandler(None, Item).set_output_format(output_format)
+        handler._results = {
+            "schema": [{"name": "id", "type": "keyword"}, {"name": "updated_at", "type": "date"}],
+            "datarows": [["i%d" % i, value] for i, value in enumerate(DATES)],
+            "total": len(DATES),
+        }
+        return handler.get_columnar_results()["records"]
+
+    def test_arrow_zoned_dates(self):
+        records = self.get_records(ARROW)
+        self.assertEqual(records.column("updated_at").to_pylist(), EXPECTED)
+
+    def test_numpy_zoned_dates(self):
+        records = self.get_records(NUMPY)
+        values = [None if v != v else v.astype("datetime64[us]").item() for v in records["updated_at"]]
+        self.assertEqual(values, EXPECTED)
+
+
+class SqlColumnarTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [
+            {"id": "i%d" % i, "grp": "g", "price": None if i % 3 == 1 else i, "updated_at": datetime(2020, 1, i + 1)}
+            for i in range(7)
+        ])
+        self.session = Session(self.engine)
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_records(self, output_format, *filters):
+        handler = QueryHandler(self.session, Item).set_fields("price,updated_at").set_output_format(output_format, 2)
+        for f in filters:
+            handler.add_filter(f)
+        return handler.get_return_payload()["records"]
+
+    def test_numpy_integer_dtype_does_not_depend_on_nulls(self):
+        records = self.get_records(NUMPY)
+        self.assertEqual(records["price"].dtype, "int64")
+        self.assertEqual(records["price"].tolist(), [0, None, 2, 3, None, 5, 6])
+        self.assertEqual(records["updated_at"].dtype, "datetime64[us]")
+        for filter_value in ("1,4", "0,2"):
+            records = self.get_records(NUMPY, DefaultFilter(Item, "id__in", ",".join("i" + v for v in filter_value)))
+            self.assertEqual(records["price"].dtype, "int64")
+        self.assertEqual(self.get_records(NUMPY, DefaultFilter(Item, "id", "missing"))["price"].dtype, "int64")
+
+    def test_arrow(self):
+        records = self.get_records(ARROW)
+        self.assertEqual(str(records.column("price").type), "int64")
+        self.assertEqual(records.column("price").to_pylist(), [0, None, 2, 3, None, 5, 6])
+        self.assertEqual(records.column("updated_at").to_pylist(), [datetime(2020, 1, i + 1) for i in range(7)])
@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy.orm import Session, sessionmaker
+from sahandler.filters import DefaultFilter
+from sahandler.query import ES_TIMEOUT, EsQueryHandler, QueryHandler
+from sahandler.routing import ReplicaRouter
+from tests.models import Item, add_items, make_engine
+
+
+class TrackingSession(Session):
+    closed = 0
+
+    def close(self):
+        TrackingSession.closed += 1
+        super().close()
+
+
+class EtagTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [
+            {"id": "i%d" % i, "grp": "g", "status": "open", "updated_at": datetime(2020, 1, i + 1)} for i in range(5)
+        ])
+        self.session = Session(self.engine)
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_handler(self, status="open"):
+        return QueryHandler(self.session, Item).add_filter(DefaultFilter(Item, "status", status))
+
+    def test_fingerprint(self):
+        self.assertEqual(self.get_handler().get_fingerprint(), (5, datetime(2020, 1, 5)))
+        self.assertEqual(self.get_handler("closed").get_fingerprint(), (0, None))
+
+    def test_etag_is_stable_for_equal_data(self):
+        etag = self.get_handler().get_etag()
+        self.assertEqual(self.get_handler().get_etag(), etag)
+        self.assertTrue(self.get_handler().is_not_modified(etag))
+        self.assertTrue(self.get_handler().is_not_modified('W/"other", %s' % etag))
+        self.assertFalse(self.get_handler().is_not_modified(None))
+        self.assertNotEqual(self.get_handler("closed").get_etag(), etag)
+
+    def test_etag_changes_with_data(self):
+        etag = self.get_handler().get_etag()
+        self.session.get(Item, "i0").updated_at = datetime(2021, 1, 1)
+        self.session.commit()
+        updated = self.get_handler().get_etag()
+        self.assertNotEqual(updated, etag)
+        self.session.delete(self.session.get(Item, "i1"))
+        self.session.commit()
+        self.assertNotEqual(self.get_handler().get_etag(), updated)
+        self.assertFalse(self.get_handler().is_not_modified(etag))
+
+    def test_fingerprint_closes_routed_sessions(self):
+        router = ReplicaRouter([sessionmaker(bind=self.engine, class_=TrackingSession)])
+        TrackingSession.closed = 0
+        handler = self.get_handler().set_router(router)
+        self.assertTrue(handler.is_not_modified(self.get_handler().get_etag()))
+        self.assertEqual(TrackingSession.closed, 1)
+        self.assertEqual(handler._sessions, {})
+
+
+class EsEtagTest(unittest.TestCase):
+    def get_response(self, row):
+        response = mock.Mock()
+        response.json.return_value = {"datarows": [row]}
+        return response
+
+    def get_handler(self):
+        return EsQueryHandler(Session(), Item).set_es("http://es", None)
+
+    def test_etag_follows_datarows(self):
+        with mock.patch("requests.post", return_value=self.get_response([5, "2020-01-05"])) as post:
+            etag = self.get_handler().get_etag()
+            self.assertTrue(self.get_handler().is_not_modified(etag))
+        self.assertEqual(post.call_args[1]["timeout"], ES_TIMEOUT)
+        self.assertIn("MAX(updated_at)", post.call_args[1]["json"]["query"])
+        with mock.patch("requests.post", return_value=self.get_response([6, "2020-01-05"])):
+            self.assertFalse(self.get_handler().is_not_modified(etag))
+
+    def test_timeout_and_errors(self):
+        response = self.get_response([5, None])
+        response.raise_for_status.side_effect = RuntimeError("503")
+        with mock.patch("requests.post", return_value=response) as post:
+            with self.assertRaises(RuntimeError):
+                self.get_handler().set_timeout(2, "count").get_fingerprint()
+        self.assertEqual(post.call_args[1]["timeout"], 2)
@@ -0,0 +1,81 @@
+import unittest
+from sahandler import filterset
+from sahandler.filters import DefaultFilter, JoinFactory, KeyValueJoinFactory, OrFilter
+from sahandler.filterset import FilterSet
+from tests.models import Attribute, Item, ItemTag, Tag
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        filterset._parse_cache.clear()
+
+    def test_invalid_keys_are_not_cached(self):
+        FilterSet.from_args(Item, dict(("junk%d" % i, "x") for i in range(100)))
+        self.assertEqual(len(filterset._parse_cache), 0)
+
+    def test_cache_is_bounded(self):
+        for i in range(filterset.MAX_CACHE_SIZE + 100):
+            FilterSet.from_args(Item, {"rel%d__name" % i: "x"}, {"rel%d" % i: {"filter": DefaultFilter}})
+        self.assertEqual(len(filterset._parse_cache), filterset.MAX_CACHE_SIZE)
+
+    def test_valid_keys_still_parse(self):
+        for _ in range(2):
+            specs = FilterSet.from_args(Item, {"name__startswith": "a", "bogus": "b"})._specs
+            self.assertEqual([s.filter_key for s in specs], ["name__startswith"])
+
+
+class ParseTest(unittest.TestCase):
+    relation_map = {
+        "tags": {
+            "filter": JoinFactory, "intermediate_model": ItemTag, "secondary_model": Tag,
+            "model_to_intermediate_relation": "item_tags", "intermediate_to_secondary_relation": "tag",
+            "value_field": "tag_id",
+        },
+        "attributes": {
+            "filter": KeyValueJoinFactory, "intermediate_model": Attribute,
+            "model_to_intermediate_relation": "attributes", "key_field": "key", "value_field": "value",
+        },
+    }
+
+    def setUp(self):
+        filterset._parse_cache.clear()
+
+    def get_keys(self, args):
+        return [s.filter_key for s in FilterSet.from_args(Item, args, self.relation_map).get_specs()]
+
+    def test_keys_are_validated_against_schema(self):
+        self.assertTrue(filterset.is_valid_key(Item, "name"))
+        self.assertTrue(filterset.is_valid_key(Item, "price", "gte"))
+        self.assertFalse(filterset.is_valid_key(Item, "price", "bogus"))
+        self.assertFalse(filterset.is_valid_key(Item, "label"))
+        self.assertFalse(filterset.is_valid_key(Item, "to_dict"))
+        self.assertFalse(filterset.is_valid_key(Item, "item_tags"))
+
+    def test_parse_key(self):
+        self.assertEqual(filterset.parse_key(Item, "name", frozenset()), (DefaultFilter, ("name",), None))
+        self.assertEqual(
+            filterset.parse_key(Item, "name_or_status__contains", frozenset()),
+            (OrFilter, ("name_or_status", "contains"), None)
+        )
+        self.assertIsNone(filterset.parse_key(Item, "name__status__in", frozenset()))
+        self.assertIsNone(filterset.parse_key(Item, "name_or_bogus", frozenset()))
+
+    def test_relation_keys_are_validated(self):
+        valid = ["tags__in", "tags__tag_id__in", "tags__tag__name", "tags__tag__name__startswith", "attributes__color"]
+        invalid = ["tags__bogus", "tags__tag_id__bogus", "tags__tag__name__id__in", "attributes__color__bogus__in"]
+        self.assertEqual(sorted(self.get_keys(dict((k, "x") for k in valid + invalid))), sorted(valid))
+
+    def test_multi_or_conditions_are_validated(self):
+        self.assertTrue(filterset.parse_multi_or(Item, "status", "open|price__gt=40"))
+        self.assertFalse(filterset.parse_multi_or(Item, "status", "open|price__gt=40=1"))
+        self.assertFalse(filterset.parse_multi_or(Item, "status", "open|price__gt"))
+        self.assertFalse(filterset.parse_multi_or(Item, "status", "open|=40"))
+        self.assertFalse(filterset.parse_multi_or(Item, "status", "open|price="))
+        self.assertFalse(filterset.parse_multi_or(Item, "status", "open|bogus=1"))
+        self.assertEqual(self.get_keys({"status": "open|price__gt=40=1", "name": "a"}), ["name"])
+
+    def test_list_values_are_split_once(self):
+        specs = FilterSet.from_args(Item, {"status__in": "a,b%2Cc", "name": "a,b"}).get_specs()
+        self.assertEqual([s.values for s in specs], [("a", "b,c"), None])
+        f = FilterSet(Item, specs).get_filters()[0]
+        self.assertEqual(f.get_values(), ["a", "b,c"])
@@ -0,0 +1,62 @@
+import unittest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sahandler import inlist
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from tests.models import Document, add_rows, make_engine
+
+BODIES = ["red apple pie", "green apple", "say \"hello\" world", "apple OR pear", "pear-tree"]
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_rows(self.engine, [Document(id=i, title="d%d" % i, body=b) for i, b in enumerate(BODIES, 1)])
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE VIRTUAL TABLE documents_fts USING fts5(body)"))
+            connection.execute(text("INSERT INTO documents_fts (rowid, body) SELECT id, body FROM documents"))
+
+    def get_query(self, session, *filters):
+        handler = QueryHandler(session, Document).set_limit(100)
+        for f in filters:
+            handler.add_filter(f)
+        return handler
+
+    def get_ids(self, *filters):
+        session = Session(self.engine)
+        payload = self.get_query(session, *filters).get_return_payload()
+        session.close()
+        return sorted(r["id"] for r in payload["records"])
+
+    def test_search(self):
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__search", "apple")), [1, 2, 4])
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__contains", "apple pie")), [1])
+
+    def test_search_terms_are_quoted(self):
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__search", "OR")), [4])
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__search", "\"hello")), [3])
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__search", "pear-tree")), [5])
+        self.assertEqual(self.get_ids(DefaultFilter(Document, "body__search", "body:apple")), [])
+
+    def test_bind_names_are_stable(self):
+        session = Session(self.engine)
+        statements = [
+            str(self.get_query(
+                session,
+                DefaultFilter(Document, "body__search", value),
+                DefaultFilter(Document, "body__match", value),
+                DefaultFilter(Document, "id__in", "1,2,3").set_in_strategy(inlist.JSON, threshold=1),
+            ).get_base_query().statement)
+            for value in ["apple", "pear"]
+        ]
+        session.close()
+        self.assertEqual(statements[0], statements[1])
+
+    def test_repeated_binds_do_not_collide(self):
+        self.assertEqual(self.get_ids(
+            DefaultFilter(Document, "body__search", "apple"),
+            DefaultFilter(Document, "body__match", "pie"),
+            DefaultFilter(Document, "id__in", "1,2").set_in_strategy(inlist.JSON, threshold=1),
+            DefaultFilter(Document, "title__in", "d1,d4").set_in_strategy(inlist.JSON, threshold=1),
+        ), [1])
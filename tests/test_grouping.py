@@ -0,0 +1,48 @@
+import types
+import unittest
+from unittest import mock
+from sqlalchemy.orm import Session
+from sahandler.query import EsQueryHandler, QueryHandler
+from tests.models import Item, add_items, make_engine
+
+
+class GroupedResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%02d" % i, "grp": "g%d" % (i % 3), "price": i} for i in range(12)])
+
+    def test_sql_groups_are_streamed(self):
+        stats = []
+        handler = QueryHandler(Session(self.engine), Item).set_response_key("grp").set_order_by("price")
+        handler.set_fields("price").add_listener(stats.append)
+        groups = handler.iter_grouped_results()
+        self.assertIsInstance(groups, types.GeneratorType)
+        self.assertEqual(stats, [])
+        self.assertEqual(list(groups), [
+            ("g%d" % g, [{"id": "i%02d" % i, "price": i} for i in range(g, 12, 3)]) for g in range(3)
+        ])
+        self.assertEqual(stats[0].get_stage("data")[2], 12)
+
+    def test_sql_groups_respect_limit(self):
+        handler = QueryHandler(Session(self.engine), Item).set_response_key("grp").set_order_by("price")
+        groups = list(handler.set_fields("price").set_limit(5).iter_grouped_results())
+        self.assertEqual([(key, [r["price"] for r in records]) for key, records in groups], [
+            ("g0", [0, 3, 6, 9]),
+            ("g1", [1]),
+        ])
+
+    def test_es_groups_es_records(self):
+        response = mock.Mock()
+        response.json.return_value = {
+            "schema": [{"name": "numeric_id", "type": "long"}, {"name": "grp", "type": "keyword"}],
+            "datarows": [[1, "a"], [2, "b"], [3, "a"]],
+            "total": 3,
+        }
+        handler = EsQueryHandler(Session(self.engine), Item).set_es("http://es", None).set_response_key("grp")
+        with mock.patch("requests.post", return_value=response) as post:
+            groups = list(handler.iter_grouped_results())
+        self.assertEqual(post.call_args[0][0], "http://es/_opendistro/_sql")
+        self.assertEqual(groups, [
+            ("a", [{"id": 1, "grp": "a"}, {"id": 3, "grp": "a"}]),
+            ("b", [{"id": 2, "grp": "b"}]),
+        ])
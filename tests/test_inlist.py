@@ -0,0 +1,37 @@
+import unittest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sahandler import inlist
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from tests.models import Item, add_items, make_engine
+
+
+class TempTableTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%03d" % i, "grp": "g"} for i in range(50)])
+
+    def get_temp_tables(self):
+        with self.engine.connect() as connection:
+            return connection.execute(text("SELECT name FROM sqlite_temp_master WHERE type = 'table'")).fetchall()
+
+    def get_ids(self, session, ids):
+        f = DefaultFilter(Item, "id__in", ",".join(ids)).set_in_strategy(inlist.TEMP_TABLE, threshold=1)
+        payload = QueryHandler(session, Item).set_limit(100).add_filter(f).get_return_payload()
+        return sorted(r["id"] for r in payload["records"])
+
+    def test_tables_dropped_after_each_request(self):
+        for request in range(5):
+            ids = ["i%03d" % i for i in range(request, 40, 3)]
+            session = Session(self.engine)
+            self.assertEqual(self.get_ids(session, ids), ids)
+            session.close()
+        self.assertEqual(self.get_temp_tables(), [])
+
+    def test_tables_dropped_after_commit(self):
+        session = Session(self.engine)
+        for request in range(3):
+            self.assertEqual(self.get_ids(session, ["i001", "i002"]), ["i001", "i002"])
+            session.commit()
+        self.assertEqual(self.get_temp_tables(), [])
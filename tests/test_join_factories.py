@@ -0,0 +1,50 @@
+import unittest
+from sqlalchemy.orm import Session
+from sahandler.filters import JoinFactory, KeyValueJoinFactory, ManyToManyKeyValueJoinFilter, OneToManyJoinFilter
+from sahandler.query import QueryHandler
+from tests.models import Attribute, Item, ItemTag, Tag, add_items, add_rows, make_engine
+
+
+class JoinFactoryTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%d" % i, "grp": "g"} for i in range(6)])
+        add_rows(self.engine, [Tag(id=t, name="tag%d" % t, app="a" if t < 3 else "b") for t in range(1, 5)])
+        add_rows(self.engine, [ItemTag(item_id="i%d" % i, tag_id=i % 4 + 1, app="ab"[i % 2]) for i in range(6)])
+        add_rows(self.engine, [
+            Attribute(item_id="i%d" % i, key="color", value=["red", "blue"][i % 2]) for i in range(6)
+        ])
+
+    def get_ids(self, f):
+        payload = QueryHandler(Session(self.engine), Item).add_filter(f).get_return_payload()
+        return sorted(r["id"] for r in payload["records"])
+
+    def get_tag_factory(self, filter_key, filter_value):
+        return JoinFactory(Item, filter_key, filter_value).set_intermediate_model(ItemTag).set_secondary_model(
+            Tag
+        ).set_model_to_intermediate_relation("item_tags").set_intermediate_to_secondary_relation(
+            "tag"
+        ).set_value_field("tag_id")
+
+    def test_one_to_many_strategy(self):
+        f = self.get_tag_factory("tags__tag_id__in", "1,2")
+        self.assertEqual(self.get_ids(f), ["i0", "i1", "i4", "i5"])
+        self.assertIsInstance(f.get_strategy(), OneToManyJoinFilter)
+        self.assertIs(f._secondary_model, Tag)
+        self.assertIsNone(f._default_column)
+
+    def test_one_to_one_to_many_strategy_uses_app(self):
+        self.assertEqual(self.get_ids(self.get_tag_factory("tags__tag__name", "tag4")), ["i3"])
+        self.assertEqual(self.get_ids(self.get_tag_factory("tags__tag__name", "tag4").set_app("a")), [])
+        self.assertEqual(self.get_ids(self.get_tag_factory("tags__tag__name", "tag4").set_app("b")), ["i3"])
+
+    def test_strategy_is_built_once(self):
+        f = self.get_tag_factory("tags__tag_id", "1")
+        self.assertIs(f.get_strategy(), f.get_strategy())
+
+    def test_key_value_factory(self):
+        f = KeyValueJoinFactory(Item, "attributes__color", "red").set_intermediate_model(
+            Attribute
+        ).set_model_to_intermediate_relation("attributes").set_key_field("key").set_value_field("value")
+        self.assertEqual(self.get_ids(f), ["i0", "i2", "i4"])
+        self.assertNotIsInstance(f.get_strategy(), ManyToManyKeyValueJoinFilter)
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy.orm import Session
+from sahandler import kvindex, phonetic
+from sahandler.filters import KeyValueJoinFactory
+from sahandler.query import QueryHandler
+from tests.models import Attribute, Item, add_items, add_rows, make_engine
+
+COLORS = ["red", "blue", "green", "Reed", None]
+
+CASES = [
+    ("attributes__color", "red"),
+    ("attributes__color__exclude", "red,blue"),
+    ("attributes__size__gte", "3"),
+    ("attributes__color__in", "red,green"),
+    ("attributes__color__soundex", "Rid"),
+    ("attributes__color__contains", "ee"),
+]
+
+
+class KeyValueIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = make_engine(os.path.join(self.directory.name, "kv.db"))
+        phonetic.register_sqlite_function(self.engine)
+        self.engine.dispose()
+        add_items(self.engine, [{"id": "i%02d" % i, "grp": "g"} for i in range(20)])
+        rows = []
+        for i in range(20):
+            app = "ab"[i % 2]
+            if COLORS[i % 5]:
+                rows.append(Attribute(item_id="i%02d" % i, key="color", value=COLORS[i % 5], app=app))
+            rows.append(Attribute(item_id="i%02d" % i, key="size", value=str(i % 7), app=app))
+        add_rows(self.engine, rows)
+        session = Session(self.engine)
+        self.index = kvindex.build_index(session, Item, ("attributes",), "key", "value", ["color", "size"])
+        session.close()
+
+    def tearDown(self):
+        kvindex.unregister_index(self.index)
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def get_ids(self, filter_key, filter_value, app=None):
+        f = KeyValueJoinFactory(Item, filter_key, filter_value).set_intermediate_model(
+            Attribute
+        ).set_model_to_intermediate_relation("attributes").set_key_field("key").set_value_field("value")
+        if app:
+            f.set_app(app)
+        session = Session(self.engine)
+        payload = QueryHandler(session, Item).set_limit(100).add_filter(f).get_return_payload()
+        session.close()
+        return sorted(r["id"] for r in payload["records"])
+
+    def get_join_ids(self, filter_key, filter_value, app=None):
+        kvindex.unregister_index(self.index)
+        try:
+            return self.get_ids(filter_key, filter_value, app)
+        finally:
+            kvindex.register_index(self.index)
+
+    def test_materialized_results_match_join(self):
+        for app in (None, "a"):
+            for filter_key, filter_value in CASES:
+                with mock.patch.object(self.index, "get_clause", wraps=self.index.get_clause) as get_clause:
+                    ids = self.get_ids(filter_key, filter_value, app)
+                self.assertTrue(get_clause.called)
+                self.assertTrue(ids)
+                self.assertEqual(ids, self.get_join_ids(filter_key, filter_value, app), (filter_key, app))
+
+    def test_unmaterialized_key_uses_join(self):
+        with mock.patch.object(self.index, "get_clause") as get_clause:
+            self.assertEqual(self.get_ids("attributes__shape", "round"), [])
+        get_clause.assert_not_called()
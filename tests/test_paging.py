@@ -0,0 +1,34 @@
+import random
+import unittest
+from sqlalchemy.orm import Session
+from sahandler.query import QueryHandler
+from tests.models import Item, add_items, make_engine
+
+
+class KeysetPagingTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        items = [{"id": "i%03d" % i, "grp": "g%d" % (i % 3), "price": i % 7} for i in range(300)]
+        random.Random(7).shuffle(items)
+        add_items(self.engine, items)
+
+    def get_handler(self):
+        return QueryHandler(Session(self.engine), Item).set_order_by("grp")
+
+    def get_ids(self, pages):
+        return [record["id"] for page in pages for record in page]
+
+    def test_non_unique_sort_column(self):
+        ids = self.get_ids(self.get_handler().iter_pages(25))
+        self.assertEqual(len(ids), 300)
+        self.assertEqual(len(set(ids)), 300)
+
+    def test_non_unique_sort_column_descending(self):
+        ids = self.get_ids(self.get_handler().set_order_dir("desc").iter_pages(25, prefetch=0))
+        self.assertEqual(len(ids), 300)
+        self.assertEqual(len(set(ids)), 300)
+
+    def test_offset_start(self):
+        ids = self.get_ids(self.get_handler().set_offset(40).iter_pages(25))
+        expected = sorted(("g%d" % (i % 3), "i%03d" % i) for i in range(300))
+        self.assertEqual(ids, [i for _, i in expected[40:]])
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from sahandler import phonetic
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from tests.models import Item, Person, add_items, make_engine
+
+NAMES = ["Robert", "Rupert", "Rubin", "Ashcraft", "Ashcroft", "Tymczak", "Pfister", "Honeyman"]
+
+
+class SoundexTest(unittest.TestCase):
+    def test_codes(self):
+        codes = [phonetic.soundex(n) for n in NAMES]
+        self.assertEqual(codes, ["R163", "R163", "R150", "A261", "A261", "T522", "P236", "H555"])
+
+    def test_edge_cases(self):
+        self.assertIsNone(phonetic.soundex(None))
+        self.assertEqual(phonetic.soundex("123"), "")
+        self.assertEqual(phonetic.soundex("Lee"), "L000")
+        self.assertEqual(phonetic.soundex("o'hara"), "O600")
+
+
+class PhoneticFieldTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        self.session = Session(self.engine)
+        self.session.add_all([Person(id=i, name=n) for i, n in enumerate(NAMES, 1)])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_handler(self, filter_value):
+        return QueryHandler(self.session, Person).set_limit(100).add_filter(
+            DefaultFilter(Person, "name__soundex", filter_value)
+        )
+
+    def test_track_sets_keys(self):
+        person = self.session.get(Person, 7)
+        self.assertEqual(person.name_soundex, "P236")
+        person.name = "Ashcraft"
+        self.session.commit()
+        self.assertEqual(self.session.get(Person, 7).name_soundex, "A261")
+
+    def test_soundex_filter_uses_phonetic_field(self):
+        sql = str(self.get_handler("Rabort").get_base_query().statement)
+        self.assertIn("persons.name_soundex =", sql)
+        self.assertNotIn("soundex(", sql)
+        payload = self.get_handler("Rabort").get_return_payload()
+        self.assertEqual(sorted(r["name"] for r in payload["records"]), ["Robert", "Rupert"])
+
+    def test_backfill_walks_primary_key(self):
+        self.session.execute(Person.__table__.update().values(name_soundex=None))
+        self.session.commit()
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            self.assertEqual(phonetic.backfill(self.session, Person, batch_size=3), len(NAMES))
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+        self.assertEqual(len(statements), 4)
+        self.assertEqual([p[-1] for s, p in statements], [0] * 4)
+        self.assertTrue(all("persons.id >" in s for s, p in statements[1:]))
+        rows = self.session.execute(select(Person.name, Person.name_soundex).order_by(Person.id)).fetchall()
+        self.assertEqual([r[1] for r in rows], [phonetic.soundex(r[0]) for r in rows])
+
+    def test_backfill_without_phonetic_fields(self):
+        self.assertEqual(phonetic.backfill(self.session, Item), 0)
+
+
+class SqliteFunctionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = phonetic.register_sqlite_function(make_engine(os.path.join(self.directory.name, "p.db")))
+        self.engine.dispose()
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def test_function_is_registered(self):
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT soundex('Ashcraft')")).scalar(), "A261")
+
+    def test_soundex_filter_without_phonetic_field(self):
+        add_items(self.engine, [{"id": "i%d" % i, "grp": "g", "name": n} for i, n in enumerate(NAMES)])
+        session = Session(self.engine)
+        handler = QueryHandler(session, Item).set_limit(100).add_filter(
+            DefaultFilter(Item, "name__soundex", "Ashcroft")
+        )
+        self.assertIn("soundex(items.name)", str(handler.get_base_query().statement))
+        payload = handler.get_return_payload()
+        session.close()
+        self.assertEqual(sorted(r["name"] for r in payload["records"]), ["Ashcraft", "Ashcroft"])
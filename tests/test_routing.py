@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy.orm import sessionmaker
+from sahandler.query import QueryHandler
+from sahandler.routing import LEAST_LATENCY, ReplicaRouter
+from tests.models import Item, add_items, make_engine
+
+DATABASES = {"primary": 1, "r1": 2, "r2": 3, "counts": 5}
+
+
+class ReplicaRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engines = {}
+        self.sessions = {}
+        for name, rows in DATABASES.items():
+            self.engines[name] = make_engine(os.path.join(self.directory, "%s.db" % name))
+            self.sessions[name] = sessionmaker(bind=self.engines[name])
+            add_items(self.engines[name], [{"id": "i%d" % i, "grp": "g", "name": name} for i in range(rows)])
+
+    def tearDown(self):
+        for engine in self.engines.values():
+            engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def get_payload(self, router, primary=False):
+        handler = QueryHandler(self.sessions["primary"](), Item).set_router(router)
+        if primary:
+            handler.use_primary()
+        payload = handler.get_return_payload()
+        return payload["total_count"], set(r["name"] for r in payload["records"])
+
+    def test_round_robin(self):
+        router = ReplicaRouter([self.sessions["r1"], self.sessions["r2"]])
+        self.assertEqual(
+            [self.get_payload(router) for _ in range(3)],
+            [(2, {"r1"}), (3, {"r2"}), (2, {"r1"})]
+        )
+
+    def test_least_latency(self):
+        router = ReplicaRouter([self.sessions["r1"], self.sessions["r2"]], policy=LEAST_LATENCY)
+        router.record(self.sessions["r1"], 0.5)
+        router.record(self.sessions["r2"], 0.1)
+        self.assertEqual(self.get_payload(router), (3, {"r2"}))
+        self.assertLess(router.get_latency(self.sessions["r2"]), 0.1)
+        self.assertEqual(router.get_latency(self.sessions["r1"]), 0.5)
+
+    def test_latency_is_smoothed(self):
+        router = ReplicaRouter([self.sessions["r1"]], decay=0.5)
+        router.record(self.sessions["r1"], 1.0)
+        router.record(self.sessions["r1"], 0.0)
+        self.assertEqual(router.get_latency(self.sessions["r1"]), 0.5)
+
+    def test_use_primary(self):
+        router = ReplicaRouter([self.sessions["r1"], self.sessions["r2"]])
+        self.assertEqual(self.get_payload(router, primary=True), (1, {"primary"}))
+        self.assertEqual(self.get_payload(router), (2, {"r1"}))
+
+    def test_count_replicas(self):
+        router = ReplicaRouter([self.sessions["r2"]], count_replicas=[self.sessions["counts"]])
+        self.assertEqual(self.get_payload(router), (5, {"r2"}))
+
+    def test_close_resets_routed_queries(self):
+        router = ReplicaRouter([self.sessions["r1"], self.sessions["r2"]])
+        handler = QueryHandler(self.sessions["primary"](), Item).set_router(router)
+        payloads = [handler.get_return_payload() for _ in range(2)]
+        self.assertIsNone(handler._base_query)
+        self.assertIsNone(handler._base_count_query)
+        self.assertEqual(
+            [(p["total_count"], set(r["name"] for r in p["records"])) for p in payloads],
+            [(2, {"r1"}), (3, {"r2"})]
+        )
+
+    def test_close_keeps_primary_queries(self):
+        session = self.sessions["primary"]()
+        handler = QueryHandler(session, Item)
+        handler.get_return_payload()
+        self.assertIs(handler._base_query.session, session)
+        self.assertEqual(handler.get_return_payload()["total_count"], 1)
+        session.close()
@@ -0,0 +1,42 @@
+import unittest
+from sqlalchemy.orm import Session
+from sahandler.query import QueryHandler
+from sahandler.serializers import MAX_CACHE_SIZE, FieldSerializer
+from tests.models import Item, add_items, make_engine
+
+
+class FieldSerializerTest(unittest.TestCase):
+    def setUp(self):
+        self.serializer = FieldSerializer()
+        self.item = Item(id="a", grp="g", name="n", price=3)
+
+    def test_equivalent_field_lists_share_an_extractor(self):
+        extractor = self.serializer.get_extractor(Item, ["name", "price"])
+        self.assertIs(self.serializer.get_extractor(Item, ["name", "price", "name"]), extractor)
+        self.assertEqual(len(self.serializer._extractors), 1)
+        self.assertEqual(extractor(self.item), {"id": "a", "name": "n", "price": 3})
+
+    def test_non_column_fields_fall_back_to_to_dict(self):
+        self.assertEqual(self.serializer.get_extractor(Item, ["label"])(self.item), self.item.to_dict(["label"]))
+
+    def test_cache_is_bounded(self):
+        for i in range(MAX_CACHE_SIZE + 50):
+            self.serializer.get_extractor(Item, ["name", "bogus%d" % i])
+        self.assertEqual(len(self.serializer._extractors), MAX_CACHE_SIZE)
+        self.assertEqual(self.serializer.get_extractor(Item, ["grp"])(self.item), {"grp": "g", "id": "a"})
+
+
+class SerializerMatchesToDictTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%d" % i, "grp": "g", "name": "n%d" % i, "price": i} for i in range(3)])
+
+    def get_records(self, fields, serializer=None):
+        handler = QueryHandler(Session(self.engine), Item).set_fields(fields)
+        if serializer is not None:
+            handler.set_serializer(serializer)
+        return handler.get_return_payload()["records"]
+
+    def test_matches_to_dict(self):
+        for fields in (None, "name", "name,price", "price,id,price", "name,label"):
+            self.assertEqual(self.get_records(fields, FieldSerializer()), self.get_records(fields), fields)
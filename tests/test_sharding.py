@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import NoResultFound
+from sahandler.sharding import ShardedQueryHandler
+from sahandler.slowlog import SlowQueryLog
+from sahandler.timeouts import QueryTimeoutError
+from tests.models import Item, add_items, make_engine
+
+SHARDS = ["s0", "s1", "s2"]
+ROWS = 600
+
+
+class ShardingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engines = {}
+        self.shards = {}
+        for shard in SHARDS:
+            self.engines[shard] = make_engine(os.path.join(self.directory, "%s.db" % shard))
+            self.shards[shard] = sessionmaker(bind=self.engines[shard])
+        for shard_index, shard in enumerate(SHARDS):
+            add_items(self.engines[shard], [
+                {"id": "i%04d" % i, "grp": "g%d" % (i % 4), "price": i, "app": shard}
+                for i in range(ROWS) if i % len(SHARDS) == shard_index
+            ])
+
+    def tearDown(self):
+        for engine in self.engines.values():
+            engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def get_handler(self):
+        return ShardedQueryHandler(self.shards, Item)
+
+    def get_expected(self, key, reverse=False):
+        return sorted(range(ROWS), key=key, reverse=reverse)
+
+    def get_prices(self, payload):
+        return [r["price"] for r in payload["records"]]
+
+    def test_counts_are_summed(self):
+        self.assertEqual(self.get_handler().get_return_payload()["total_count"], ROWS)
+
+    def test_merged_order_across_shards(self):
+        payload = self.get_handler().set_order_by("price").set_order_dir("desc").set_limit(40).get_return_payload()
+        self.assertEqual(self.get_prices(payload), self.get_expected(None, reverse=True)[:40])
+
+    def test_merged_order_on_several_columns(self):
+        handler = self.get_handler().set_order_by("grp,price").set_order_dir("asc,desc").set_limit(ROWS)
+        expected = self.get_expected(lambda i: (i % 4, -i))
+        self.assertEqual(self.get_prices(handler.get_return_payload()), expected)
+
+    def test_global_offset(self):
+        for offset in (0, 7, 50, ROWS - 10):
+            payload = self.get_handler().set_order_by("price").set_offset(offset).set_limit(20).get_return_payload()
+            self.assertEqual(self.get_prices(payload), list(range(ROWS))[offset:offset + 20])
+            self.assertEqual(payload["total_count"], ROWS)
+
+    def test_pinned_app(self):
+        payload = self.get_handler().set_app("s1").set_order_by("price").set_limit(ROWS).get_return_payload()
+        self.assertEqual(payload["total_count"], ROWS // len(SHARDS))
+        self.assertEqual(set(r["app"] for r in payload["records"]), {"s1"})
+        self.assertEqual(self.get_prices(payload), list(range(1, ROWS, len(SHARDS))))
+
+    def test_get_many_across_shards(self):
+        results = self.get_handler().get_many(["i0001", "i0002", "i0003", "missing"])
+        self.assertEqual(sorted(results["i0001"]), sorted(c.key for c in Item.__table__.columns))
+        self.assertEqual([results[i]["app"] for i in ("i0001", "i0002", "i0003")], ["s1", "s2", "s0"])
+        self.assertIsInstance(results["missing"], NoResultFound)
+
+    def test_etag_combines_shards(self):
+        etag = self.get_handler().get_etag()
+        self.assertTrue(self.get_handler().is_not_modified(etag))
+        session = self.shards["s2"]()
+        session.query(Item).filter(Item.id == "i0002").update({"updated_at": datetime(2030, 1, 1)})
+        session.commit()
+        session.close()
+        handler = self.get_handler()
+        self.assertFalse(handler.is_not_modified(etag))
+        self.assertEqual(handler.get_last_modified(), datetime(2030, 1, 1))
+        self.assertEqual(handler.get_fingerprint()[0], ROWS)
+
+    def test_unsupported_paths_raise(self):
+        with self.assertRaises(ValueError):
+            self.get_handler().set_output_format("arrow")
+        for call in (
+            lambda h: list(h.iter_pages(10)),
+            lambda h: list(h.set_response_key("grp").iter_grouped_results()),
+            lambda h: h.get_results(),
+            lambda h: h.get_count(),
+        ):
+            with self.assertRaises(NotImplementedError):
+                call(self.get_handler())
+
+    def test_count_timeout_falls_back_to_estimate(self):
+        payload = self.get_handler().set_timeout(1e-9, "count").set_count_fallback().get_return_payload()
+        self.assertTrue(payload["is_estimated_count"])
+        self.assertNotIn("total_count", payload)
+        self.assertEqual(len(payload["records"]), 30)
+
+    def test_count_timeout_falls_back_to_callable(self):
+        payload = self.get_handler().set_timeout(1e-9, "count").set_count_fallback(lambda h: 7).get_return_payload()
+        self.assertTrue(payload["is_estimated_count"])
+        self.assertEqual(payload["total_count"], 7 * len(SHARDS))
+
+    def test_count_timeout_without_fallback(self):
+        with self.assertRaises(QueryTimeoutError):
+            self.get_handler().set_timeout(1e-9, "count").get_return_payload()
+
+    def test_exact_count_is_not_estimated(self):
+        payload = self.get_handler().set_count_fallback().get_return_payload()
+        self.assertNotIn("is_estimated_count", payload)
+        self.assertEqual(payload["total_count"], ROWS)
+
+    def test_shard_queries_are_logged(self):
+        slow_query_log = SlowQueryLog(0, explain=False)
+        self.get_handler().set_slow_query_log(slow_query_log).get_return_payload()
+        kinds = sorted(e["kind"] for e in slow_query_log.get_entries())
+        self.assertEqual(kinds, ["count"] * len(SHARDS) + ["data"] * len(SHARDS))
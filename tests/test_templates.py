@@ -0,0 +1,39 @@
+import unittest
+from sqlalchemy.orm import Session
+from sahandler.templates import InvalidArgumentError, QueryTemplate
+from tests.models import Item, add_items, make_engine
+
+
+class QueryTemplateTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "a", "grp": "g", "name": "n", "status": "open", "price": 10}])
+        self.template = QueryTemplate(Item, allowed_fields=["name", "status"])
+
+    def get_record(self, args):
+        return self.template.bind(Session(self.engine), args).get_return_payload()["records"][0]
+
+    def test_filters_requested_fields(self):
+        self.assertEqual(self.get_record({"fields": "name,price"}), {"id": "a", "name": "n"})
+
+    def test_disallowed_fields_fall_back_to_allowed(self):
+        self.assertEqual(self.get_record({"fields": "price"}), {"id": "a", "name": "n", "status": "open"})
+
+    def test_missing_fields_fall_back_to_allowed(self):
+        self.assertEqual(self.get_record({}), {"id": "a", "name": "n", "status": "open"})
+
+    def test_defaults_are_filtered(self):
+        self.template = QueryTemplate(Item, allowed_fields=["name"], fields="name,price")
+        self.assertEqual(self.get_record({}), {"id": "a", "name": "n"})
+
+    def test_limit_and_offset_are_parsed(self):
+        handler = self.template.bind(Session(self.engine), {"limit": "5", "offset": "0"})
+        self.assertEqual((handler._limit, handler._offset), (5, 0))
+
+    def test_invalid_limit_and_offset(self):
+        for key, value in (("limit", "ten"), ("limit", "1.5"), ("offset", "-1"), ("offset", None)):
+            with self.assertRaises(InvalidArgumentError) as context:
+                self.template.bind(Session(self.engine), {key: value})
+            self.assertIsInstance(context.exception, ValueError)
+            self.assertEqual((context.exception.setting, context.exception.value), (key, value))
+            self.assertEqual(str(context.exception), "invalid %s %r: expected a non-negative integer" % (key, value))
@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+from sqlalchemy.orm import Session
+from sahandler import timeouts
+from sahandler.filters import DefaultFilter
+from sahandler.query import QueryHandler
+from sahandler.timeouts import QueryTimeoutError
+from tests.models import Item, add_items, make_engine
+
+
+class CountFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_engine()
+        add_items(self.engine, [{"id": "i%03d" % i, "grp": "g", "price": i} for i in range(3000)])
+        self.session = Session(self.engine)
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_handler(self):
+        return QueryHandler(self.session, Item).set_limit(5).add_filter(DefaultFilter(Item, "price__lt", "10"))
+
+    def test_timeout_without_fallback_raises(self):
+        with self.assertRaises(QueryTimeoutError):
+            self.get_handler().set_timeout(1e-9, "count").get_return_payload()
+
+    def test_estimate_is_omitted_when_unavailable(self):
+        payload = self.get_handler().set_timeout(1e-9, "count").set_count_fallback().get_return_payload()
+        self.assertTrue(payload["is_estimated_count"])
+        self.assertNotIn("total_count", payload)
+        self.assertEqual(len(payload["records"]), 5)
+
+    def test_estimate_uses_filtered_query(self):
+        handler = self.get_handler().set_timeout(1e-9, "count").set_count_fallback()
+        with mock.patch("sahandler.query.estimate_count", return_value=None) as estimate:
+            handler.get_return_payload()
+        query = estimate.call_args[0][0]
+        self.assertIn("items.price <", str(query.statement))
+        self.assertEqual(query.count(), 10)
+
+    def test_estimate_reads_planner_rows(self):
+        query = mock.MagicMock()
+        query.session.get_bind.return_value.dialect.name = "postgresql"
+        execute = query.session.connection.return_value.exec_driver_sql
+        execute.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 1234}}]
+        with mock.patch.object(timeouts, "compile_query", return_value=("SELECT id FROM items", {})):
+            self.assertEqual(timeouts.estimate_count(query), 1234)
+        execute.assert_called_once_with("EXPLAIN (FORMAT JSON) SELECT id FROM items", {})
+
+    def test_callable_fallback(self):
+        handler = self.get_handler().set_timeout(1e-9, "count").set_count_fallback(lambda h: 42)
+        payload = handler.get_return_payload()
+        self.assertEqual((payload["total_count"], payload["is_estimated_count"]), (42, True))
+
+    def test_exact_count_is_not_estimated(self):
+        payload = self.get_handler().set_count_fallback().get_return_payload()
+        self.assertEqual(payload["total_count"], 10)
+        self.assertNotIn("is_estimated_count", payload)